@@ -4,8 +4,12 @@ Adapt the existing batch tagger to create single MPC files for Claude Desktop
 This is a simple wrapper that uses the existing functionality
 """
 
+import os
 import sys
 import json
+import heapq
+import functools
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime
 
@@ -14,23 +18,42 @@ sys.path.append(str(Path(__file__).parent))
 from obsidian_batch_tagger import ObsidianBatchTagger
 from ..config import VAULT_PATH
 
+# Use orjson for JSON parsing when available, stdlib json otherwise
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 def load_tag_statistics(vault_path):
     """Load the most recent tag statistics from tag_data_*.json"""
-    tag_data_files = list(Path(vault_path).glob('claude_workspace/scripts/tagging/tag_data_*.json'))
+    tagging_dir = Path(vault_path) / 'claude_workspace' / 'scripts' / 'tagging'
+    try:
+        with os.scandir(tagging_dir) as it:
+            tag_data_files = [e for e in it
+                              if e.name.startswith('tag_data_') and e.name.endswith('.json')]
+    except FileNotFoundError:
+        tag_data_files = []
     if not tag_data_files:
         return {}
     
     # Get most recent file
-    latest_file = max(tag_data_files, key=lambda p: p.stat().st_mtime)
+    latest_file = max(tag_data_files, key=lambda e: e.stat().st_mtime)
     
-    with open(latest_file, 'r') as f:
-        data = json.load(f)
+    return _load_top_tags(latest_file.path, latest_file.stat().st_mtime_ns)
+
+@functools.lru_cache(maxsize=4)
+def _load_top_tags(tag_data_path: str, mtime_ns: int):
+    """Parse a tag_data file once per (path, mtime) and return its top 20 tags"""
+    with open(tag_data_path, 'rb') as f:
+        data = _loads(f.read())
     
     # Get top 20 tags by usage
     tag_usage = data.get('tag_usage', {})
-    sorted_tags = sorted(tag_usage.items(), key=lambda x: x[1], reverse=True)[:20]
+    sorted_tags = heapq.nlargest(20, tag_usage.items(), key=itemgetter(1))
     
-    return sorted_tags
+    return tuple(sorted_tags)
 
 def create_mpc_for_article(article_file: str, vault_path: str):
     """Create an MPC file for a single article"""
@@ -3,12 +3,28 @@
 Simple script to add Claude's tag suggestions to manual_tag_suggestions.json
 """
 
+import os
 import json
+import shutil
 import sys
 from pathlib import Path
 from datetime import datetime
 from ..config import VAULT_PATH
 
+# Use orjson for JSON I/O when available, stdlib json otherwise
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
 def update_suggestions(article_file: str, tags: str, vault_path: str):
     """Update manual_tag_suggestions.json with new tags"""
     
@@ -16,8 +32,7 @@ def update_suggestions(article_file: str, tags: str, vault_path: str):
     
     # Load existing suggestions
     if suggestions_file.exists():
-        with open(suggestions_file, 'r') as f:
-            suggestions = json.load(f)
+        suggestions = _loads(suggestions_file.read_bytes())
     else:
         suggestions = {}
     
@@ -30,15 +45,32 @@ def update_suggestions(article_file: str, tags: str, vault_path: str):
     # Update suggestions
     suggestions[article_file] = tag_list
     
-    # Backup existing file
+    new_content = _dumps(suggestions)
+    
+    # Nothing to do if the file already holds exactly this content
+    if suggestions_file.exists() and suggestions_file.read_bytes() == new_content:
+        print(f"ℹ️  No changes for {article_file}")
+        return
+    
+    # Write updated suggestions to a temporary file first
+    tmp_path = suggestions_file.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(new_content)
+        f.flush()
+        os.fsync(f.fileno())
+    
+    # Backup existing file as a hardlink to the current inode
     if suggestions_file.exists():
         backup_path = suggestions_file.with_suffix(f'.backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-        suggestions_file.rename(backup_path)
+        try:
+            os.link(suggestions_file, backup_path)
+        except OSError:
+            # Hardlinks unsupported here (or cross-device): fall back to a copy
+            shutil.copy2(suggestions_file, backup_path)
         print(f"📁 Backed up to: {backup_path.name}")
     
-    # Write updated suggestions
-    with open(suggestions_file, 'w') as f:
-        json.dump(suggestions, f, indent=2)
+    # Atomically swap in the new content
+    os.replace(tmp_path, suggestions_file)
     
     print(f"✅ Updated manual_tag_suggestions.json")
     print(f"📝 Added tags for {article_file}: {', '.join(tag_list)}")
@@ -33,17 +33,25 @@ replacements = [
     (r'claude_workspace/system1_tagging/manual_tag_suggestions\.json', 'system1_tagging/manual_tag_suggestions.json'),
 ]
 
+# Compiled once; every pattern above mentions claude_workspace, so files
+# without that substring can be skipped before any regex runs
+COMPILED_REPLACEMENTS = [(re.compile(p), r) for p, r in replacements]
+SENTINEL = b'claude_workspace'
+
 def fix_file(file_path):
     """Fix export paths in a single file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        data = Path(file_path).read_bytes()
+        if SENTINEL not in data:
+            print(f"ℹ️  No changes needed: {file_path}")
+            return False
         
+        content = data.decode('utf-8')
         original_content = content
         
         # Apply replacements
-        for old_pattern, new_pattern in replacements:
-            content = re.sub(old_pattern, new_pattern, content)
+        for pattern, new_pattern in COMPILED_REPLACEMENTS:
+            content = pattern.sub(new_pattern, content)
         
         # Only write if changed
         if content != original_content:
@@ -4,16 +4,74 @@ Paperpile BibTeX to Markdown Exporter
 Converts entries from paperpile.bib to markdown files in Obsidian vault format
 """
 
+import io
 import os
 import re
+from collections import deque
+import json
 import bibtexparser
 from bibtexparser.bparser import BibTexParser
-from bibtexparser.customization import convert_to_unicode
+from bibtexparser.latexenc import latex_to_unicode
 from datetime import datetime
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Use orjson for the sync manifest when available, stdlib json otherwise
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+def _iter_md(root):
+    """Yield os.DirEntry objects for all .md files under root (recursive)"""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.md'):
+                    yield entry
+
 class PaperpileExporter:
+    # Curly braces used for BibTeX case protection
+    _CURLY_RE = re.compile(r'[{}]')
+    # Runs of whitespace (including newlines) in abstracts
+    _WS_RE = re.compile(r'\s+')
+    # Characters that are not allowed (or awkward) in filenames
+    _SANITIZE = str.maketrans({
+        '/': '-', '\\': '-', ':': '-', '*': '-', '?': '',
+        '"': "'", '<': '-', '>': '-', '|': '-',
+    })
+    # Fields read by generate_filename/format_as_markdown; only these are
+    # converted from LaTeX to unicode while parsing
+    _EMITTED_FIELDS = (
+        'title', 'author', 'year', 'journal', 'publisher', 'abstract',
+        'volume', 'number', 'pages', 'doi', 'isbn', 'url', 'keywords',
+    )
+    # (field, label) pairs for the "Additional Information" section
+    _ADDITIONAL_FIELDS = (
+        ('volume', 'Volume'), ('number', 'Issue'), ('pages', 'Pages'),
+        ('doi', 'DOI'), ('isbn', 'ISBN'), ('url', 'URL'),
+    )
+    # Footer written by format_as_markdown; used to recognise exported files
+    _PAPERPILE_MARKER = b'*Imported from Paperpile on'
+    # The marker is the last line of an export, so only the tail is probed
+    _MARKER_PROBE_BYTES = 4096
+    # Per-file {path: [mtime_ns, is_paperpile]} cache kept in the output dir
+    _MANIFEST_NAME = '.paperpile_manifest.json'
+    # Worker threads used to render notes in export_all
+    _EXPORT_WORKERS = 8
+    # Entries rendered ahead of the writer; keeps memory flat on large libraries
+    _EXPORT_WINDOW = _EXPORT_WORKERS * 4
+    
     def __init__(self, bib_path, output_dir):
         """Initialize with paths to bib file and output directory"""
         self.bib_path = Path(bib_path)
@@ -27,18 +85,59 @@ class PaperpileExporter:
         
         self.session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
         
+        # Names of .md files anywhere under output_dir, built on first use
+        self._existing_names = None
+        
+        # Marker-probe results from earlier runs, see load_manifest()
+        self.manifest_path = self.output_dir / self._MANIFEST_NAME
+        self._manifest = None
+        
     def parse_bibtex(self):
-        """Parse the BibTeX file and return entries"""
-        parser = BibTexParser()
-        parser.customization = convert_to_unicode
+        """Parse the BibTeX file and yield entries one at a time"""
+        parser = BibTexParser(
+            common_strings=False,
+            interpolate_strings=False,
+            homogenize_fields=False,
+            ignore_nonstandard_types=True,
+        )
+        parser.customization = self._convert_emitted_fields
         
         with open(self.bib_path, 'r', encoding='utf-8') as bibfile:
             bib_database = bibtexparser.load(bibfile, parser=parser)
         
-        return bib_database.entries
+        yield from bib_database.entries
     
-    def format_authors(self, author_string):
-        """Format authors from BibTeX format to list of names"""
+    def _convert_emitted_fields(self, record):
+        """Convert LaTeX escapes to unicode in the fields that are exported"""
+        for field in self._EMITTED_FIELDS:
+            value = record.get(field)
+            if isinstance(value, str):
+                record[field] = latex_to_unicode(value)
+        return record
+    
+    def iter_entries(self, abstract_only=True):
+        """Yield parsed entries, optionally only those with a non-empty abstract"""
+        for entry in self.parse_bibtex():
+            if abstract_only and not entry.get('abstract', '').strip():
+                continue
+            yield entry
+    
+    def format_authors(self, author_string, entry=None):
+        """Format authors from BibTeX format to list of names
+        
+        If entry is given, the result is cached on it as entry['_authors'] so
+        the filename and markdown steps parse the author list only once.
+        """
+        if entry is not None and '_authors' in entry:
+            return entry['_authors']
+        
+        formatted_authors = self._parse_authors(author_string)
+        if entry is not None:
+            entry['_authors'] = formatted_authors
+        return formatted_authors
+    
+    def _parse_authors(self, author_string):
+        """Split a BibTeX author field into firstName/lastName/fullName dicts"""
         if not author_string:
             return []
         
@@ -79,7 +178,7 @@ class PaperpileExporter:
     def generate_filename(self, entry):
         """Generate filename based on entry metadata"""
         # Get authors
-        authors = self.format_authors(entry.get('author', ''))
+        authors = self.format_authors(entry.get('author', ''), entry)
         
         # Format author string
         if not authors:
@@ -99,21 +198,13 @@ class PaperpileExporter:
         # Get title
         title = entry.get('title', 'Untitled')
         # Remove curly braces from title
-        title = re.sub(r'[{}]', '', title)
+        title = self._CURLY_RE.sub('', title)
         
         # Create filename
         filename = f"{author_string} ({year}). {title}.md"
         
         # Sanitize filename
-        filename = filename.replace('/', '-')
-        filename = filename.replace('\\', '-')
-        filename = filename.replace(':', '-')
-        filename = filename.replace('*', '-')
-        filename = filename.replace('?', '')
-        filename = filename.replace('"', "'")
-        filename = filename.replace('<', '-')
-        filename = filename.replace('>', '-')
-        filename = filename.replace('|', '-')
+        filename = filename.translate(self._SANITIZE)
         
         # Limit length
         if len(filename) > 255:
@@ -126,22 +217,18 @@ class PaperpileExporter:
     
     def format_as_markdown(self, entry):
         """Convert BibTeX entry to markdown format"""
-        md_lines = []
+        buf = io.StringIO()
         
         # Title
         title = entry.get('title', 'Untitled')
-        title = re.sub(r'[{}]', '', title)  # Remove curly braces
-        md_lines.append(f"# {title}\n")
+        title = self._CURLY_RE.sub('', title)  # Remove curly braces
         
-        # Metadata section
-        md_lines.append("## Metadata\n")
-        
-        # Type
+        # Title, metadata section and type
         entry_type = entry.get('ENTRYTYPE', 'article').title()
-        md_lines.append(f"**Type:** {entry_type}")
+        buf.write(f"# {title}\n\n## Metadata\n\n**Type:** {entry_type}\n")
         
         # Authors
-        authors = self.format_authors(entry.get('author', ''))
+        authors = self.format_authors(entry.get('author', ''), entry)
         if authors:
             # Convert to wikilinks with first and last name
             author_links = []
@@ -151,96 +238,126 @@ class PaperpileExporter:
                 if full_name:
                     author_links.append(f"[[{full_name}]]")
             if author_links:
-                md_lines.append(f"**Author(s):** {', '.join(author_links)}")
+                buf.write(f"**Author(s):** {', '.join(author_links)}\n")
         
         # Date/Year
         if 'year' in entry:
-            md_lines.append(f"**Date:** {entry['year']}")
+            buf.write(f"**Date:** {entry['year']}\n")
         
         # Journal/Publisher - with wikilinks just like Zotero script
         if 'journal' in entry:
-            md_lines.append(f"**Journal:** [[{entry['journal']}]]")
+            buf.write(f"**Journal:** [[{entry['journal']}]]\n")
         elif 'publisher' in entry:
-            md_lines.append(f"**Publisher:** [[{entry['publisher']}]]")
+            buf.write(f"**Publisher:** [[{entry['publisher']}]]\n")
         
         # Abstract
         if 'abstract' in entry:
             abstract = entry['abstract']
             # Clean up abstract formatting
-            abstract = re.sub(r'\s+', ' ', abstract)  # Replace multiple spaces/newlines with single space
+            abstract = self._WS_RE.sub(' ', abstract)  # Replace multiple spaces/newlines with single space
             abstract = abstract.strip()
-            md_lines.append(f"\n## Abstract\n\n{abstract}")
+            buf.write(f"\n## Abstract\n\n{abstract}\n")
         
         # Additional fields
-        other_fields = []
-        
-        if 'volume' in entry:
-            other_fields.append(f"**Volume:** {entry['volume']}")
-        
-        if 'number' in entry:
-            other_fields.append(f"**Issue:** {entry['number']}")
-        
-        if 'pages' in entry:
-            other_fields.append(f"**Pages:** {entry['pages']}")
-        
-        if 'doi' in entry:
-            other_fields.append(f"**DOI:** {entry['doi']}")
-        
-        if 'isbn' in entry:
-            other_fields.append(f"**ISBN:** {entry['isbn']}")
-        
-        if 'url' in entry:
-            other_fields.append(f"**URL:** {entry['url']}")
-        
+        other_fields = ''.join(
+            f"**{label}:** {entry[field]}\n"
+            for field, label in self._ADDITIONAL_FIELDS
+            if field in entry
+        )
         if other_fields:
-            md_lines.append("\n## Additional Information\n")
-            md_lines.extend(other_fields)
+            buf.write(f"\n## Additional Information\n\n{other_fields}")
         
         # Keywords/Tags
         if 'keywords' in entry:
             keywords = entry['keywords'].split(',')
             # Convert to hashtags
             hashtags = [f"#{keyword.strip().replace(' ', '_')}" for keyword in keywords]
-            md_lines.append(f"\n## Tags\n\n{', '.join(hashtags)}")
-        
-        # Paperpile Information (similar to Zotero Information section)
-        md_lines.append("\n## Paperpile Information\n")
-        md_lines.append(f"**Key:** {entry.get('ID', 'unknown')}")
-        md_lines.append(f"**Entry Type:** @{entry.get('ENTRYTYPE', 'article')}")
-        md_lines.append(f"**Date Added:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        # Add note about source - keep this for tracking
-        md_lines.append(f"\n---\n*Imported from Paperpile on {datetime.now().strftime('%Y-%m-%d')}*")
+            buf.write(f"\n## Tags\n\n{', '.join(hashtags)}\n")
+        
+        # Paperpile Information (similar to Zotero Information section),
+        # followed by a note about source - keep this for tracking
+        now = datetime.now()
+        buf.write(
+            f"\n## Paperpile Information\n\n"
+            f"**Key:** {entry.get('ID', 'unknown')}\n"
+            f"**Entry Type:** @{entry.get('ENTRYTYPE', 'article')}\n"
+            f"**Date Added:** {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"\n---\n*Imported from Paperpile on {now.strftime('%Y-%m-%d')}*"
+        )
         
-        return '\n'.join(md_lines)
+        return buf.getvalue()
+    
+    def build_existing_index(self):
+        """Collect the names of all .md files in the output tree in one walk"""
+        existing_names = {entry.name for entry in _iter_md(self.output_dir)}
+        self._existing_names = existing_names
+        return existing_names
     
     def check_file_exists_in_tree(self, filename):
         """Check if file exists in output directory or any subdirectory"""
-        # Check in main directory
-        if (self.output_dir / filename).exists():
-            return True
-        
-        # Check in all subdirectories
-        for subdir in self.output_dir.rglob('*/'):
-            if (subdir / filename).exists():
-                return True
-        
-        return False
+        if self._existing_names is None:
+            self.build_existing_index()
+        return filename in self._existing_names
+    
+    def has_paperpile_marker(self, md_file):
+        """Check the end of md_file for the Paperpile import marker"""
+        with open(md_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - self._MARKER_PROBE_BYTES))
+            tail = f.read()
+        return self._PAPERPILE_MARKER in tail
+    
+    def load_manifest(self):
+        """Load the sync manifest so unchanged files need not be re-read"""
+        if self._manifest is None:
+            try:
+                self._manifest = _loads(self.manifest_path.read_bytes())
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+    
+    def save_manifest(self):
+        """Write the sync manifest back to the output directory"""
+        if self._manifest is None:
+            return
+        try:
+            self.manifest_path.write_bytes(_dumps(self._manifest))
+        except OSError as e:
+            print(f"Error writing {self.manifest_path}: {e}")
+    
+    def record_in_manifest(self, filepath, is_paperpile):
+        """Remember the marker status of filepath at its current mtime"""
+        manifest = self.load_manifest()
+        manifest[str(filepath)] = [os.stat(filepath).st_mtime_ns, is_paperpile]
     
     def find_paperpile_files(self):
         """Find all files that were imported from Paperpile"""
         paperpile_files = []
+        manifest = self.load_manifest()
+        seen = set()
         
         # Search in output directory and all subdirectories
-        for md_file in self.output_dir.rglob('*.md'):
+        for md_entry in _iter_md(self.output_dir):
+            key = md_entry.path
+            seen.add(key)
             try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Check if file contains Paperpile import marker
-                    if '*Imported from Paperpile on' in content:
-                        paperpile_files.append(md_file)
+                mtime_ns = md_entry.stat().st_mtime_ns
+                cached = manifest.get(key)
+                if cached is not None and cached[0] == mtime_ns:
+                    is_paperpile = cached[1]
+                else:
+                    # Check if file ends with the Paperpile import marker
+                    is_paperpile = self.has_paperpile_marker(key)
+                    manifest[key] = [mtime_ns, is_paperpile]
+                if is_paperpile:
+                    paperpile_files.append(Path(key))
             except Exception as e:
-                print(f"Error reading {md_file}: {e}")
+                print(f"Error reading {key}: {e}")
+        
+        # Forget files that no longer exist
+        for key in manifest.keys() - seen:
+            del manifest[key]
         
         return paperpile_files
     
@@ -261,45 +378,54 @@ class PaperpileExporter:
         """Find files in main folder that exist in subfolders"""
         duplicates = []
         
-        # Get all files in main directory (not in subdirectories)
-        main_folder_files = [f for f in self.output_dir.glob('*.md') if f.is_file()]
-        
-        # Check each file to see if it exists in any subdirectory
-        for main_file in main_folder_files:
-            filename = main_file.name
-            
-            # Check subdirectories
-            for subdir in self.output_dir.iterdir():
-                if subdir.is_dir() and not subdir.name.startswith('.'):
-                    subfile = subdir / filename
-                    if subfile.exists():
-                        # Verify both are paperpile imports
-                        try:
-                            with open(main_file, 'r', encoding='utf-8') as f:
-                                if '*Imported from Paperpile on' in f.read():
-                                    duplicates.append((main_file, subfile))
-                                    break
-                        except Exception as e:
-                            print(f"Error reading {main_file}: {e}")
+        # Get all files in main directory (not in subdirectories) and the subdirectories
+        main_folder_files = {}
+        subdirs = []
+        with os.scandir(self.output_dir) as it:
+            for e in it:
+                if e.is_file(follow_symlinks=False) and e.name.endswith('.md'):
+                    main_folder_files[e.name] = Path(e.path)
+                elif e.is_dir() and not e.name.startswith('.'):
+                    subdirs.append(Path(e.path))
+        
+        # Map each main-folder filename to the first subdirectory that also has it
+        found_in = {}
+        for subdir in subdirs:
+            with os.scandir(subdir) as it:
+                names = {e.name for e in it}
+            for filename in (names & main_folder_files.keys()) - found_in.keys():
+                found_in[filename] = subdir / filename
+        
+        # Verify the main-folder copy is a paperpile import
+        for filename, subfile in found_in.items():
+            main_file = main_folder_files[filename]
+            try:
+                if self.has_paperpile_marker(main_file):
+                    duplicates.append((main_file, subfile))
+            except Exception as e:
+                print(f"Error reading {main_file}: {e}")
         
         return duplicates
     
-    def sync_with_paperpile(self, abstract_only=True, dry_run=False, remove_duplicates=False):
-        """Sync markdown files with paperpile.bib - remove orphaned files and optionally duplicates"""
-        print(f"Syncing with BibTeX file: {self.bib_path}")
+    def sync_with_paperpile(self, abstract_only=True, dry_run=False, remove_duplicates=False,
+                            expected_files=None):
+        """Sync markdown files with paperpile.bib - remove orphaned files and optionally duplicates
         
-        # Get all entries from BibTeX
-        entries = self.parse_bibtex()
-        if abstract_only:
-            entries = [e for e in entries if 'abstract' in e and e['abstract'].strip()]
+        If expected_files is given (e.g. collected during export_all), the
+        BibTeX file is not parsed again.
+        """
+        print(f"Syncing with BibTeX file: {self.bib_path}")
         
         # Get expected filenames
-        expected_files = self.get_expected_filenames(entries)
+        if expected_files is None:
+            expected_files = self.get_expected_filenames(self.iter_entries(abstract_only))
         print(f"Expected {len(expected_files)} files from paperpile.bib")
         
         # Find existing paperpile files
         paperpile_files = self.find_paperpile_files()
         print(f"Found {len(paperpile_files)} existing files imported from Paperpile")
+        if not dry_run:
+            self.save_manifest()
         
         # Find orphaned files
         orphaned_files = []
@@ -332,72 +458,119 @@ class PaperpileExporter:
                 for file in all_files_to_remove:
                     try:
                         file.unlink()
+                        self.load_manifest().pop(str(file), None)
                         print(f"Removed: {file.name}")
                     except Exception as e:
                         print(f"Error removing {file}: {e}")
+                self.save_manifest()
             else:
                 print("Skipping file removal.")
         
         return len(orphaned_files), len(duplicates_to_remove)
     
+    def _render_entry(self, entry):
+        """Build (entry, filename, md_content, error) for one entry in a worker thread"""
+        filename = md_content = None
+        try:
+            # Generate filename
+            filename = self.generate_filename(entry)
+            # Generate markdown content
+            md_content = self.format_as_markdown(entry)
+        except Exception as e:
+            return entry, filename, md_content, e
+        return entry, filename, md_content, None
+    
+    def write_markdown(self, filepath, md_content):
+        """Write md_content to filepath as UTF-8 with one unbuffered write"""
+        data = memoryview(md_content.encode('utf-8'))
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+    
     def export_all(self, abstract_only=True, dry_run=False, sync_mode=False, remove_duplicates=False):
-        """Export all entries to markdown files"""
-        # Run sync first if requested
-        if sync_mode:
-            orphaned_count, duplicate_count = self.sync_with_paperpile(
-                abstract_only=abstract_only, 
-                dry_run=dry_run,
-                remove_duplicates=remove_duplicates
-            )
-            print(f"\n{'='*50}\n")
+        """Export all entries to markdown files
         
+        Entries are streamed from the BibTeX file in a single pass; in sync
+        mode the expected filenames are collected along the way and the
+        orphan/duplicate cleanup runs after the export.
+        """
         print(f"Reading BibTeX file: {self.bib_path}")
-        entries = self.parse_bibtex()
-        print(f"Found {len(entries)} entries in BibTeX file")
-        
-        # Filter entries with abstracts if requested
-        if abstract_only:
-            entries_with_abstract = [e for e in entries if 'abstract' in e and e['abstract'].strip()]
-            print(f"Found {len(entries_with_abstract)} entries with abstracts")
-            entries = entries_with_abstract
         
+        total_count = 0
+        processed_count = 0
         exported_count = 0
         skipped_count = 0
         errors = []
+        expected_files = set()
         
-        for entry in entries:
-            try:
-                # Generate markdown content
-                md_content = self.format_as_markdown(entry)
-                
-                # Generate filename
-                filename = self.generate_filename(entry)
-                filepath = self.output_dir / filename
-                
-                # Check if file already exists anywhere in the tree
-                if self.check_file_exists_in_tree(filename):
-                    print(f"Skipping (already exists): {filename}")
-                    skipped_count += 1
+        def selected_entries():
+            nonlocal total_count
+            for entry in self.parse_bibtex():
+                total_count += 1
+                # Filter entries with abstracts if requested
+                if abstract_only and not entry.get('abstract', '').strip():
                     continue
+                yield entry
+        
+        def rendered_entries(executor):
+            # Submit a bounded window of entries so the generator isn't
+            # drained up front and finished notes don't pile up in memory
+            pending = deque()
+            for entry in selected_entries():
+                pending.append(executor.submit(self._render_entry, entry))
+                if len(pending) >= self._EXPORT_WINDOW:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        
+        # Index the tree once instead of walking it for every entry
+        self.build_existing_index()
+        
+        # Render notes in worker threads; existence checks and writes stay
+        # here so they happen in entry order
+        with ThreadPoolExecutor(max_workers=self._EXPORT_WORKERS) as executor:
+            for entry, filename, md_content, error in rendered_entries(executor):
+                processed_count += 1
                 
-                if dry_run:
-                    print(f"Would create: {filename}")
-                else:
-                    # Write file
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(md_content)
-                    print(f"Created: {filename}")
-                
-                exported_count += 1
-                
-            except Exception as e:
-                error_msg = f"Error processing entry {entry.get('ID', 'unknown')}: {e}"
-                print(error_msg)
-                errors.append(error_msg)
+                try:
+                    if filename is not None:
+                        expected_files.add(filename)
+                    if error is not None:
+                        raise error
+                    filepath = self.output_dir / filename
+                    
+                    # Check if file already exists anywhere in the tree
+                    if self.check_file_exists_in_tree(filename):
+                        print(f"Skipping (already exists): {filename}")
+                        skipped_count += 1
+                        continue
+                    
+                    if dry_run:
+                        print(f"Would create: {filename}")
+                    else:
+                        # Write file
+                        self.write_markdown(filepath, md_content)
+                        self._existing_names.add(filename)
+                        self.record_in_manifest(filepath, True)
+                        print(f"Created: {filename}")
+                    
+                    exported_count += 1
+                    
+                except Exception as e:
+                    error_msg = f"Error processing entry {entry.get('ID', 'unknown')}: {e}"
+                    print(error_msg)
+                    errors.append(error_msg)
+        
+        print(f"\nFound {total_count} entries in BibTeX file")
+        if abstract_only:
+            print(f"Found {processed_count} entries with abstracts")
         
         # Summary
         print(f"\n{'DRY RUN ' if dry_run else ''}Summary:")
-        print(f"- Total entries processed: {len(entries)}")
+        print(f"- Total entries processed: {processed_count}")
         print(f"- Files {'would be created' if dry_run else 'created'}: {exported_count}")
         print(f"- Files skipped (already exist): {skipped_count}")
         print(f"- Errors: {len(errors)}")
@@ -407,6 +580,19 @@ class PaperpileExporter:
             for error in errors:
                 print(f"  - {error}")
         
+        if not dry_run:
+            self.save_manifest()
+        
+        # Run sync with the filenames gathered above
+        if sync_mode:
+            print(f"\n{'='*50}\n")
+            self.sync_with_paperpile(
+                abstract_only=abstract_only,
+                dry_run=dry_run,
+                remove_duplicates=remove_duplicates,
+                expected_files=expected_files
+            )
+        
         return exported_count
 
 def main():
@@ -3,6 +3,18 @@ import os
 import re
 import shutil
 
+# Filename patterns, tried in order:
+#   1. Author_Year_Title (underscore separated)
+#   2. Author (Year). Title
+#   3. Author_n.d._Title (no date)
+FILENAME_RE = re.compile(
+    r'^(?:'
+    r'(?P<a1>.+?)_(?P<y1>\d{4})_(?P<t1>.+)'
+    r'|(?P<a2>.+?)\s*\((?P<y2>\d{4})\)\.\s*(?P<t2>.+)'
+    r'|(?P<a3>.+?)_n\.d\._(?P<t3>.+)'
+    r')$'
+)
+
 def parse_filename(filename):
     """Parse different filename patterns to extract author(s), year, and title."""
     
@@ -12,34 +24,15 @@ def parse_filename(filename):
     else:
         return None
     
-    # Pattern 1: Author_Year_Title (underscore separated)
-    pattern1 = r'^(.+?)_(\d{4})_(.+)$'
-    match1 = re.match(pattern1, base_name)
-    if match1:
-        authors = match1.group(1)
-        year = match1.group(2)
-        title = match1.group(3).replace('-', ' ')
-        return authors, year, title
-    
-    # Pattern 2: Author (Year). Title
-    pattern2 = r'^(.+?)\s*\((\d{4})\)\.\s*(.+)$'
-    match2 = re.match(pattern2, base_name)
-    if match2:
-        authors = match2.group(1)
-        year = match2.group(2)
-        title = match2.group(3)
-        return authors, year, title
-    
-    # Pattern 3: Author_n.d._Title (no date)
-    pattern3 = r'^(.+?)_n\.d\._(.+)$'
-    match3 = re.match(pattern3, base_name)
-    if match3:
-        authors = match3.group(1)
-        year = 'n.d.'
-        title = match3.group(2).replace('-', ' ')
-        return authors, year, title
+    match = FILENAME_RE.match(base_name)
+    if not match:
+        return None
     
-    return None
+    if match.group('a1') is not None:
+        return match.group('a1'), match.group('y1'), match.group('t1').replace('-', ' ')
+    if match.group('a2') is not None:
+        return match.group('a2'), match.group('y2'), match.group('t2')
+    return match.group('a3'), 'n.d.', match.group('t3').replace('-', ' ')
 
 def format_authors(authors_str):
     """Format author names properly with commas and ampersands."""
@@ -52,21 +45,21 @@ def format_authors(authors_str):
     elif ' and ' in authors_str:
         author_list = authors_str.split(' and ')
     elif ',' in authors_str:
-        author_list = [a.strip() for a in authors_str.split(',')]
+        author_list = authors_str.split(',')
     else:
         # Single author
         return authors_str.strip()
     
+    author_list = [a.strip() for a in author_list]
+    
     # Format multiple authors
     if len(author_list) == 1:
-        return author_list[0].strip()
+        return author_list[0]
     elif len(author_list) == 2:
-        return f"{author_list[0].strip()} & {author_list[1].strip()}"
+        return f"{author_list[0]} & {author_list[1]}"
     else:
         # More than 2 authors
-        formatted = ", ".join([a.strip() for a in author_list[:-1]])
-        formatted += f" & {author_list[-1].strip()}"
-        return formatted
+        return ", ".join(author_list[:-1]) + f" & {author_list[-1]}"
 
 def create_new_filename(authors, year, title):
     """Create the new standardized filename."""
@@ -79,15 +72,18 @@ def main():
     # Directory containing the articles
     directory = "/Users/niklaskarlsson/Obsidian Sandbox/Research Hub/4 Articles/Test articles abstracts"
     
-    # Create a mapping of old to new filenames
-    rename_map = {}
+    # Plan of (old path, old filename, new filename) renames
+    rename_plan = []
     errors = []
     
     print("Analyzing files...")
     print("-" * 80)
     
-    for filename in os.listdir(directory):
-        if filename.endswith('.md'):
+    with os.scandir(directory) as it:
+        for entry in it:
+            filename = entry.name
+            if not filename.endswith('.md'):
+                continue
             parsed = parse_filename(filename)
             if parsed:
                 authors, year, title = parsed
@@ -95,7 +91,7 @@ def main():
                 
                 # Check if new filename already exists or conflicts
                 if new_filename != filename:
-                    rename_map[filename] = new_filename
+                    rename_plan.append((entry.path, filename, new_filename))
                     print(f"OLD: {filename}")
                     print(f"NEW: {new_filename}")
                     print()
@@ -108,19 +104,16 @@ def main():
             print(f"  - {error}")
     
     print("-" * 80)
-    print(f"\nFound {len(rename_map)} files to rename.")
+    print(f"\nFound {len(rename_plan)} files to rename.")
     
-    if rename_map:
+    if rename_plan:
         response = input("\nDo you want to proceed with renaming? (yes/no): ")
         
         if response.lower() == 'yes':
             print("\nRenaming files...")
-            for old_name, new_name in rename_map.items():
-                old_path = os.path.join(directory, old_name)
-                new_path = os.path.join(directory, new_name)
-                
+            for old_path, old_name, new_name in rename_plan:
                 try:
-                    os.rename(old_path, new_path)
+                    os.rename(old_path, os.path.join(directory, new_name))
                     print(f"✓ Renamed: {old_name} -> {new_name}")
                 except Exception as e:
                     print(f"✗ Error renaming {old_name}: {str(e)}")
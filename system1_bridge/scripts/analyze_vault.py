@@ -4,16 +4,120 @@ Analyze Obsidian vault to prepare for Paperpile synchronization.
 Matches existing files to BibTeX entries and reports on migration readiness.
 """
 
+import os
 import re
+import sys
 import json
 import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Set, Tuple, Optional
 import bibtexparser
-from colorama import init, Fore, Style
 
-init(autoreset=True)
+# Use orjson for writing reports when available, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# colorama is only needed to translate ANSI codes for the Windows console
+if sys.platform == 'win32':
+    from colorama import init
+    init(autoreset=True)
+
+# Terminal colours; plain text when output is piped or redirected
+_USE_COLOR = sys.stdout.isatty()
+CYAN = '\x1b[36m' if _USE_COLOR else ''
+YELLOW = '\x1b[33m' if _USE_COLOR else ''
+RED = '\x1b[31m' if _USE_COLOR else ''
+RESET = '\x1b[0m' if _USE_COLOR else ''
+
+# Precompiled patterns used while scanning vault files
+_KEY_RE = re.compile(r'BibTeX Key:\s*(\S+)')
+_TITLE_RE = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+_YEAR_RE = re.compile(r'\((\d{4})\)')
+_SECTION_RE = re.compile(r'^##\s+(.+)$', re.MULTILINE)
+_PDF_RE = re.compile(r'\[\[([^\]]+\.pdf)\]\]')
+_BRACE_TABLE = str.maketrans('', '', '{}')
+_NORM_PUNCT = re.compile(r'[^\w\s]')
+_NORM_WS = re.compile(r'\s+')
+
+# Content checks in analyze_content, one named group per 'has_<name>' flag.
+# Tags and PDF links are lookaheads so only '#'/'[[' is consumed and no
+# other marker inside them (e.g. '#BibTeX Key:') is skipped.
+_CONTENT_RE = re.compile(
+    r'(?P<bibtex_key>BibTeX Key:)|(?P<doi>DOI:|doi\.org)|(?P<abstract>## Abstract)'
+    r'|(?P<tags>#(?=\w))|(?P<user_notes>## (?:My )?Notes|## Ideas|## Connections)'
+    r'|(?P<paperpile_marker>Imported from Paperpile)|(?P<pdf_link>\[\[(?=.*\.pdf\]\]))'
+)
+_CONTENT_FLAGS = {name: f'has_{name}' for name in _CONTENT_RE.groupindex}
+
+# Bytes read from the top of a note when looking for its BibTeX key/title
+_HEAD_BYTES = 8192
+
+# Below this many files a process pool costs more to start than it saves
+_PARALLEL_THRESHOLD = 64
+
+# Analyzer copy used by pool workers, installed by _init_worker
+_worker_analyzer = None
+
+
+def _init_worker(analyzer: 'VaultAnalyzer'):
+    """Give a pool worker its own copy of the analyzer (BibTeX entries and indexes)"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _run_in_worker(method_name: str, md_path: str):
+    """Call a per-file VaultAnalyzer method inside a pool worker"""
+    return getattr(_worker_analyzer, method_name)(md_path)
+
+
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_bibtex_entries(bibtex_path: Path) -> List[Dict]:
+    """Parse a BibTeX file into v1-style entry dicts (ID, ENTRYTYPE, fields)
+    
+    Uses the much faster bibtexparser v2 API when it is installed and falls
+    back to the v1 parser otherwise.
+    """
+    bibtex_str = Path(bibtex_path).read_text(encoding='utf-8')
+    
+    if hasattr(bibtexparser, 'parse_string'):
+        library = bibtexparser.parse_string(bibtex_str)
+        entries = []
+        for entry in library.entries:
+            fields = {field.key.lower(): field.value for field in entry.fields}
+            fields['ID'] = entry.key
+            fields['ENTRYTYPE'] = entry.entry_type.lower()
+            entries.append(fields)
+        return entries
+    
+    return bibtexparser.loads(bibtex_str).entries
+
+
+def write_json_report(report: Dict, report_path: Path):
+    """Write a report as indented UTF-8 JSON"""
+    if orjson is not None:
+        report_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(report_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and strip punctuation/extra whitespace for matching"""
+    title = _NORM_PUNCT.sub('', title.lower())
+    title = _NORM_WS.sub(' ', title)
+    return title.strip()
+
 
 class VaultAnalyzer:
     def __init__(self, vault_path: str, bibtex_path: str):
@@ -29,10 +133,17 @@ class VaultAnalyzer:
         self.unmatched_files = []
         self.pdf_links = {}
         self.content_analysis = {}
+        # Per-file analyses made as a by-product of match_files
+        self._prefetched_analysis = {}
+        
+        # Lookup indexes over bibtex_entries, see build_indexes()
+        self._title_norm_to_entry = {}
+        self._by_title_word = {}
+        self._by_year = {}
         
     def run_analysis(self):
         """Run complete vault analysis"""
-        print(f"\n{Fore.CYAN}=== VAULT ANALYSIS ==={Style.RESET_ALL}\n")
+        print(f"\n{CYAN}=== VAULT ANALYSIS ==={RESET}\n")
         
         # Step 1: Parse BibTeX
         print("1. Parsing BibTeX file...")
@@ -58,19 +169,29 @@ class VaultAnalyzer:
         print("\n6. Generating report...")
         return self.generate_report()
     
-    def parse_bibtex(self):
-        """Parse BibTeX file and extract all entries"""
+    def parse_bibtex(self, raw_entries: Optional[List[Dict]] = None):
+        """Parse BibTeX file and extract all entries
+        
+        raw_entries lets a caller that has already parsed the file (as
+        v1-style entry dicts) skip reading it again.
+        """
         try:
-            with open(self.bibtex_path, 'r', encoding='utf-8') as f:
-                bib_database = bibtexparser.load(f)
+            if raw_entries is None:
+                raw_entries = load_bibtex_entries(self.bibtex_path)
             
-            for entry in bib_database.entries:
+            for entry in raw_entries:
                 key = entry.get('ID', '')
+                title = self.clean_title(entry.get('title', ''))
+                title_norm = normalize_title(title)
+                author = entry.get('author', '')
                 self.bibtex_entries[key] = {
                     'key': key,
                     'type': entry.get('ENTRYTYPE', 'article'),
-                    'title': self.clean_title(entry.get('title', '')),
-                    'author': entry.get('author', ''),
+                    'title': title,
+                    '_title_norm': title_norm,
+                    '_title_words': frozenset(title_norm.split()),
+                    'author': author,
+                    '_lastnames': self.extract_lastnames(author),
                     'year': entry.get('year', 'n.d.'),
                     'journal': entry.get('journaltitle', entry.get('journal', '')),
                     'doi': entry.get('doi', ''),
@@ -80,86 +201,181 @@ class VaultAnalyzer:
                     'raw_entry': entry
                 }
             
+            self.build_indexes()
             print(f"  ✓ Found {len(self.bibtex_entries)} BibTeX entries")
             
         except Exception as e:
-            print(f"  {Fore.RED}✗ Error parsing BibTeX: {e}{Style.RESET_ALL}")
+            print(f"  {RED}✗ Error parsing BibTeX: {e}{RESET}")
             raise
     
+    def build_indexes(self):
+        """Index BibTeX entries by normalized title, title word and year
+        
+        Lets find_bibtex_match look at a handful of candidates per file
+        instead of every entry.
+        """
+        self._title_norm_to_entry = {}
+        self._by_title_word = {}
+        self._by_year = {}
+        
+        for position, entry in enumerate(self.bibtex_entries.values()):
+            entry['_position'] = position
+            self._title_norm_to_entry.setdefault(entry['_title_norm'], entry)
+            for word in entry['_title_words']:
+                self._by_title_word.setdefault(word, []).append(entry)
+            self._by_year.setdefault(entry['year'], []).append(entry)
+    
     def clean_title(self, title: str) -> str:
         """Clean BibTeX title formatting"""
         # Remove BibTeX formatting
-        title = re.sub(r'[{}]', '', title)
-        title = re.sub(r'\s+', ' ', title)
-        return title.strip()
+        return _NORM_WS.sub(' ', title.translate(_BRACE_TABLE)).strip()
+    
+    def iter_md_files(self):
+        """Yield (name, path) of the markdown files in the Articles folder, as the directory is read"""
+        with os.scandir(self.articles_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.md') and entry.is_file():
+                    yield entry.name, entry.path
     
     def scan_vault(self):
         """Scan vault for markdown files"""
         if not self.articles_dir.exists():
-            print(f"  {Fore.YELLOW}⚠ Articles directory not found: {self.articles_dir}{Style.RESET_ALL}")
+            print(f"  {YELLOW}⚠ Articles directory not found: {self.articles_dir}{RESET}")
             return
         
-        self.vault_files = list(self.articles_dir.glob("*.md"))
+        self.vault_files = list(self.iter_md_files())
         print(f"  ✓ Found {len(self.vault_files)} markdown files in /4 Articles/")
     
+    def map_files(self, method_name: str, paths: List[str]) -> List:
+        """Apply a per-file method to file paths, in a process pool for larger batches
+        
+        Results come back in the order of paths.
+        """
+        if len(paths) < _PARALLEL_THRESHOLD:
+            method = getattr(self, method_name)
+            return [method(md_path) for md_path in paths]
+        
+        with ProcessPoolExecutor(initializer=_init_worker, initargs=(self,)) as executor:
+            return list(executor.map(partial(_run_in_worker, method_name), paths, chunksize=32))
+    
     def match_files(self):
-        """Match vault files to BibTeX entries"""
-        for md_file in self.vault_files:
-            match = self.find_bibtex_match(md_file)
-            if match:
-                self.matched_files.append((md_file, match))
+        """Match vault files to BibTeX entries
+        
+        Fills matched_files with (filename, BibTeX key) pairs and
+        unmatched_files with filenames; see get_matched_entry().
+        """
+        results = self.map_files('find_bibtex_match_key', [path for _, path in self.vault_files])
+        for (name, _path), (key, analysis) in zip(self.vault_files, results):
+            if key is not None:
+                self.matched_files.append((name, key))
+                if analysis is not None:
+                    self._prefetched_analysis[name] = analysis
             else:
-                self.unmatched_files.append(md_file)
+                self.unmatched_files.append(name)
         
         print(f"  ✓ Matched: {len(self.matched_files)} files")
         print(f"  ⚠ Unmatched: {len(self.unmatched_files)} files")
     
-    def find_bibtex_match(self, md_file: Path) -> Optional[Dict]:
+    def get_matched_entry(self, entry_key: str) -> Dict:
+        """Resolve a key from matched_files to its BibTeX entry"""
+        return self.bibtex_entries[entry_key]
+    
+    def find_bibtex_match_key(self, md_path: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Return (matching BibTeX key, content analysis) as a picklable pool result
+        
+        When matching already read the whole file, the file is analyzed from
+        that same text so analyze_content doesn't have to read it again.
+        """
+        match, content = self.read_and_match(md_path)
+        if match is None:
+            return None, None
+        analysis = self.analyze_text(content) if content is not None else None
+        return match['key'], analysis
+    
+    def find_bibtex_match(self, md_path: str) -> Optional[Dict]:
         """Find matching BibTeX entry for a markdown file"""
-        content = md_file.read_text(encoding='utf-8')
-        
+        return self.read_and_match(md_path)[0]
+    
+    def read_and_match(self, md_path: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Find the matching BibTeX entry and return it with the file text
+        
+        The key and title heading live at the top of a note, so only the
+        first _HEAD_BYTES are read; the whole file is read only when
+        nothing matched and the file is longer than that. The returned text
+        is the complete file content, or None if only the head was read.
+        """
+        with open(md_path, 'rb') as f:
+            head = f.read(_HEAD_BYTES)
+            truncated = len(head) == _HEAD_BYTES and f.read(1) != b''
+        if truncated:
+            # Don't let the title regex see a line cut off mid-way
+            head = head[:head.rfind(b'\n') + 1]
+        
+        content = head.decode('utf-8', errors='replace')
+        match = self.match_by_content(content) or self.match_by_filename(os.path.basename(md_path))
+        if not truncated:
+            return match, content
+        if match is None:
+            content = _read_text(md_path)
+            return self.match_by_content(content), content
+        return match, None
+    
+    def match_by_content(self, content: str) -> Optional[Dict]:
+        """Match on the BibTeX key or the first heading in the file content"""
         # Strategy 1: Look for BibTeX key in file
-        key_match = re.search(r'BibTeX Key:\s*(\S+)', content)
+        key_match = _KEY_RE.search(content)
         if key_match:
             key = key_match.group(1)
             if key in self.bibtex_entries:
                 return self.bibtex_entries[key]
         
         # Strategy 2: Extract title from first heading
-        title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+        title_match = _TITLE_RE.search(content)
         if title_match:
-            file_title = title_match.group(1).strip()
-            # Try to match against BibTeX titles
-            for key, entry in self.bibtex_entries.items():
-                if self.titles_match(file_title, entry['title']):
+            file_title = normalize_title(title_match.group(1))
+            # Exact match on the normalized title
+            entry = self._title_norm_to_entry.get(file_title)
+            if entry is not None:
+                return entry
+            
+            # Fuzzy match against entries sharing at least one title word
+            file_words = frozenset(file_title.split())
+            candidates = {}
+            for word in file_words:
+                for entry in self._by_title_word.get(word, ()):
+                    candidates[entry['_position']] = entry
+            for position in sorted(candidates):
+                entry = candidates[position]
+                if self.titles_match(file_title, entry, file_words):
                     return entry
         
+        return None
+    
+    def match_by_filename(self, filename: str) -> Optional[Dict]:
+        """Match on the authors and year in an 'Authors (Year). Title.md' filename"""
         # Strategy 3: Extract authors and year from filename
-        filename = md_file.stem
-        year_match = re.search(r'\((\d{4})\)', filename)
+        filename = os.path.splitext(filename)[0]
+        year_match = _YEAR_RE.search(filename)
         if year_match:
             year = year_match.group(1)
-            # Extract potential author names
-            author_part = filename.split('(')[0].strip()
+            # Extract potential author names, lowered once for all candidates
+            author_part_lower = filename.partition('(')[0].strip().lower()
             
-            for key, entry in self.bibtex_entries.items():
-                if entry['year'] == year:
-                    # Check if authors match
-                    if self.authors_match(author_part, entry['author']):
-                        return entry
+            for entry in self._by_year.get(year, ()):
+                # Check if authors match
+                if self.authors_match(author_part_lower, entry['_lastnames']):
+                    return entry
         
         return None
     
-    def titles_match(self, title1: str, title2: str) -> bool:
-        """Check if two titles match (fuzzy matching)"""
-        # Normalize titles
-        def normalize(t):
-            t = re.sub(r'[^\w\s]', '', t.lower())
-            t = re.sub(r'\s+', ' ', t)
-            return t.strip()
+    def titles_match(self, file_title: str, entry: Dict, file_words: Optional[frozenset] = None) -> bool:
+        """Check if a normalized file title matches an entry's title (fuzzy matching)
         
-        t1 = normalize(title1)
-        t2 = normalize(title2)
+        file_title must already be passed through normalize_title(); the
+        entry side is precomputed in parse_bibtex.
+        """
+        t1 = file_title
+        t2 = entry['_title_norm']
         
         # Exact match
         if t1 == t2:
@@ -170,21 +386,20 @@ class VaultAnalyzer:
             return True
         
         # Check word overlap (at least 70% of words match)
-        words1 = set(t1.split())
-        words2 = set(t2.split())
+        words1 = file_words if file_words is not None else frozenset(t1.split())
+        words2 = entry['_title_words']
         if words1 and words2:
             overlap = len(words1 & words2) / min(len(words1), len(words2))
             return overlap >= 0.7
         
         return False
     
-    def authors_match(self, filename_authors: str, bibtex_authors: str) -> bool:
-        """Check if authors from filename match BibTeX authors"""
-        # Extract last names from BibTeX authors
+    def extract_lastnames(self, bibtex_authors: str) -> Tuple[str, ...]:
+        """Extract lowercased last names from a BibTeX author field"""
         bibtex_lastnames = []
         for author in bibtex_authors.split(' and '):
             if ',' in author:
-                lastname = author.split(',')[0].strip()
+                lastname = author.split(',', 1)[0].strip()
             else:
                 parts = author.strip().split()
                 if parts:
@@ -192,36 +407,67 @@ class VaultAnalyzer:
                 else:
                     continue  # Skip empty author
             bibtex_lastnames.append(lastname.lower())
-        
+        return tuple(bibtex_lastnames)
+    
+    def authors_match(self, author_part_lower: str, bibtex_lastnames: Tuple[str, ...]) -> bool:
+        """Check if lowercased authors from a filename match an entry's precomputed last names"""
         # Check if filename contains these names
-        filename_lower = filename_authors.lower()
-        matches = sum(1 for name in bibtex_lastnames if name in filename_lower)
+        matches = sum(name in author_part_lower for name in bibtex_lastnames)
         
         return matches >= min(2, len(bibtex_lastnames))  # At least 2 or all authors
     
     def analyze_content(self):
-        """Analyze content of matched files"""
-        for md_file, bibtex_entry in self.matched_files[:5]:  # Sample first 5
-            content = md_file.read_text(encoding='utf-8')
-            
-            analysis = {
-                'has_bibtex_key': bool(re.search(r'BibTeX Key:', content)),
-                'has_doi': bool(re.search(r'DOI:|doi\.org', content)),
-                'has_abstract': bool(re.search(r'## Abstract', content)),
-                'has_tags': bool(re.search(r'#\w+', content)),
-                'has_user_notes': bool(re.search(r'## (My )?Notes|## Ideas|## Connections', content)),
-                'has_paperpile_marker': bool(re.search(r'Imported from Paperpile', content)),
-                'has_pdf_link': bool(re.search(r'\[\[.*\.pdf\]\]', content)),
-                'content_sections': self.extract_sections(content)
-            }
-            
-            self.content_analysis[md_file.name] = analysis
+        """Analyze content of all matched files"""
+        names = [name for name, entry_key in self.matched_files]
+        
+        # Reuse analyses made while matching; only read the remaining files
+        to_read = [name for name in names if name not in self._prefetched_analysis]
+        paths = [os.path.join(self.articles_dir, name) for name in to_read]
+        for name, analysis in zip(to_read, self.map_files('analyze_file', paths)):
+            self._prefetched_analysis[name] = analysis
+        
+        for name in names:
+            self.content_analysis[name] = self._prefetched_analysis[name]
+    
+    def analyze_file(self, md_path: str) -> Dict:
+        """Analyze the content structure of a single file"""
+        return self.analyze_text(_read_text(md_path))
+    
+    def analyze_text(self, content: str) -> Dict:
+        """Analyze the content structure of a file's text"""
+        analysis = dict.fromkeys(_CONTENT_FLAGS.values(), False)
+        
+        # One scan for all markers, stopping once every flag is set
+        remaining = len(_CONTENT_FLAGS)
+        for match in _CONTENT_RE.finditer(content):
+            flag = _CONTENT_FLAGS[match.lastgroup]
+            if not analysis[flag]:
+                analysis[flag] = True
+                remaining -= 1
+                if not remaining:
+                    break
+        
+        analysis['content_sections'] = self.extract_sections(content)
+        return analysis
     
     def extract_sections(self, content: str) -> List[str]:
         """Extract section headers from content"""
-        headers = re.findall(r'^##\s+(.+)$', content, re.MULTILINE)
+        headers = _SECTION_RE.findall(content)
         return headers
     
+    def find_pdf_links(self, md_path: str) -> List[str]:
+        """Return the PDF wikilink targets in a single file"""
+        content = _read_text(md_path)
+        return _PDF_RE.findall(content)
+    
+    def index_pdfs(self) -> Set[str]:
+        """Return vault-relative paths ('9 Paperpile/...pdf') of all PDFs in the PDF folder"""
+        pdf_set = set()
+        for root, _dirs, files in os.walk(self.pdf_dir):
+            rel_root = Path(root).relative_to(self.vault_path).as_posix()
+            pdf_set.update(f"{rel_root}/{name}" for name in files if name.lower().endswith('.pdf'))
+        return pdf_set
+    
     def check_pdf_links(self):
         """Check PDF links in files"""
         pdf_check_results = {
@@ -231,25 +477,29 @@ class VaultAnalyzer:
             'examples': []
         }
         
-        for md_file in self.vault_files[:10]:  # Check first 10 files
-            content = md_file.read_text(encoding='utf-8')
-            pdf_links = re.findall(r'\[\[([^\]]+\.pdf)\]\]', content)
-            
+        # One walk of the PDF folder instead of a stat per link
+        pdf_set = self.index_pdfs()
+        
+        results = self.map_files('find_pdf_links', [path for _, path in self.vault_files])
+        for (name, _path), pdf_links in zip(self.vault_files, results):
             for pdf_link in pdf_links:
                 # Check if PDF exists
                 if pdf_link.startswith('../'):
                     # Relative path from /4 Articles/
-                    pdf_path = self.vault_path / pdf_link[3:]
+                    rel_path = pdf_link[3:]
                 else:
-                    pdf_path = self.vault_path / pdf_link
+                    rel_path = pdf_link
+                pdf_path = self.vault_path / rel_path
                 
-                if pdf_path.exists():
+                # Links outside the PDF folder (or differing only in case on a
+                # case-insensitive filesystem) still get a real existence check
+                if rel_path in pdf_set or pdf_path.exists():
                     pdf_check_results['working'] += 1
                 else:
                     pdf_check_results['broken'] += 1
                     if len(pdf_check_results['examples']) < 3:
                         pdf_check_results['examples'].append({
-                            'file': md_file.name,
+                            'file': name,
                             'link': pdf_link,
                             'expected_path': str(pdf_path)
                         })
@@ -258,27 +508,30 @@ class VaultAnalyzer:
     
     def generate_report(self) -> Dict:
         """Generate comprehensive analysis report"""
+        # Computed once and shared by the readiness and recommendation steps
+        match_rate = self.get_match_rate()
+        patterns = self.analyze_content_patterns()
+        
         report = {
             'summary': {
                 'bibtex_entries': len(self.bibtex_entries),
                 'vault_files': len(self.vault_files),
                 'matched_files': len(self.matched_files),
                 'unmatched_files': len(self.unmatched_files),
-                'match_rate': f"{len(self.matched_files) / len(self.vault_files) * 100:.1f}%" if self.vault_files else "0%"
+                'match_rate': f"{match_rate * 100:.1f}%" if self.vault_files else "0%"
             },
             'pdf_links': self.pdf_links,
-            'content_patterns': self.analyze_content_patterns(),
-            'migration_readiness': self.assess_migration_readiness(),
-            'unmatched_files': [f.name for f in self.unmatched_files[:10]],  # First 10
-            'recommendations': self.generate_recommendations()
+            'content_patterns': patterns,
+            'migration_readiness': self.assess_migration_readiness(patterns, match_rate),
+            'unmatched_files': self.unmatched_files[:10],  # First 10
+            'recommendations': self.generate_recommendations(patterns, match_rate)
         }
         
         # Save detailed report
         report_path = self.vault_path / Path(__file__).parent.parent / "export" / f"vault_analysis_{datetime.now():%Y%m%d_%H%M%S}.json"
         report_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        write_json_report(report, report_path)
         
         self.print_report(report)
         print(f"\n📄 Detailed report saved to: {report_path}")
@@ -290,11 +543,17 @@ class VaultAnalyzer:
         if not self.content_analysis:
             return {'sample_size': 0}
         
+        has_key = has_notes = has_pp = 0
+        for a in self.content_analysis.values():
+            has_key += a['has_bibtex_key']
+            has_notes += a['has_user_notes']
+            has_pp += a['has_paperpile_marker']
+        
         patterns = {
             'sample_size': len(self.content_analysis),
-            'has_bibtex_key': sum(1 for a in self.content_analysis.values() if a['has_bibtex_key']),
-            'has_user_notes': sum(1 for a in self.content_analysis.values() if a['has_user_notes']),
-            'has_paperpile_marker': sum(1 for a in self.content_analysis.values() if a['has_paperpile_marker']),
+            'has_bibtex_key': has_key,
+            'has_user_notes': has_notes,
+            'has_paperpile_marker': has_pp,
             'common_sections': self.find_common_sections()
         }
         
@@ -306,24 +565,27 @@ class VaultAnalyzer:
         for analysis in self.content_analysis.values():
             all_sections.extend(analysis['content_sections'])
         
-        # Count occurrences
-        section_counts = {}
-        for section in all_sections:
-            section_counts[section] = section_counts.get(section, 0) + 1
-        
         # Return top 5
-        sorted_sections = sorted(section_counts.items(), key=lambda x: x[1], reverse=True)
-        return [s[0] for s in sorted_sections[:5]]
+        return [section for section, _ in Counter(all_sections).most_common(5)]
+    
+    def get_match_rate(self) -> float:
+        """Fraction of vault files matched to a BibTeX entry"""
+        return len(self.matched_files) / len(self.vault_files) if self.vault_files else 0
     
-    def assess_migration_readiness(self) -> Dict:
+    def assess_migration_readiness(self, patterns: Optional[Dict] = None,
+                                   match_rate: Optional[float] = None) -> Dict:
         """Assess readiness for migration"""
+        if patterns is None:
+            patterns = self.analyze_content_patterns()
+        if match_rate is None:
+            match_rate = self.get_match_rate()
+        
         readiness = {
             'score': 0,
             'factors': {}
         }
         
         # Factor 1: Match rate
-        match_rate = len(self.matched_files) / len(self.vault_files) if self.vault_files else 0
         readiness['factors']['match_rate'] = {
             'value': f"{match_rate * 100:.1f}%",
             'status': '✅' if match_rate > 0.8 else '⚠️' if match_rate > 0.5 else '❌'
@@ -343,7 +605,7 @@ class VaultAnalyzer:
         
         # Factor 3: BibTeX keys present
         if self.content_analysis:
-            key_rate = self.analyze_content_patterns()['has_bibtex_key'] / len(self.content_analysis)
+            key_rate = patterns['has_bibtex_key'] / len(self.content_analysis)
             readiness['factors']['bibtex_keys'] = {
                 'value': f"{key_rate * 100:.1f}% have keys",
                 'status': '✅' if key_rate > 0.5 else '⚠️' if key_rate > 0.2 else '❌'
@@ -353,7 +615,7 @@ class VaultAnalyzer:
         
         # Factor 4: User content
         if self.content_analysis:
-            user_content_rate = self.analyze_content_patterns()['has_user_notes'] / len(self.content_analysis)
+            user_content_rate = patterns['has_user_notes'] / len(self.content_analysis)
             readiness['factors']['user_content'] = {
                 'value': f"{user_content_rate * 100:.1f}% have user notes",
                 'status': '✅ Important to preserve'
@@ -370,12 +632,17 @@ class VaultAnalyzer:
         
         return readiness
     
-    def generate_recommendations(self) -> List[str]:
+    def generate_recommendations(self, patterns: Optional[Dict] = None,
+                                 match_rate: Optional[float] = None) -> List[str]:
         """Generate actionable recommendations"""
+        if patterns is None:
+            patterns = self.analyze_content_patterns()
+        if match_rate is None:
+            match_rate = self.get_match_rate()
+        
         recommendations = []
         
         # Based on match rate
-        match_rate = len(self.matched_files) / len(self.vault_files) if self.vault_files else 0
         if match_rate < 0.8:
             recommendations.append(f"Review {len(self.unmatched_files)} unmatched files - they may need manual matching")
         
@@ -385,7 +652,6 @@ class VaultAnalyzer:
         
         # Based on content analysis
         if self.content_analysis:
-            patterns = self.analyze_content_patterns()
             if patterns['has_bibtex_key'] < patterns['sample_size'] * 0.5:
                 recommendations.append("Many files lack BibTeX keys - migration will rely on title/author matching")
             
@@ -400,26 +666,26 @@ class VaultAnalyzer:
     
     def print_report(self, report: Dict):
         """Print formatted report to console"""
-        print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}VAULT ANALYSIS REPORT{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
+        print(f"\n{CYAN}{'='*60}{RESET}")
+        print(f"{CYAN}VAULT ANALYSIS REPORT{RESET}")
+        print(f"{CYAN}{'='*60}{RESET}\n")
         
         # Summary
-        print(f"{Fore.YELLOW}📊 SUMMARY{Style.RESET_ALL}")
+        print(f"{YELLOW}📊 SUMMARY{RESET}")
         print(f"  BibTeX entries: {report['summary']['bibtex_entries']}")
         print(f"  Vault files: {report['summary']['vault_files']}")
         print(f"  Matched: {report['summary']['matched_files']} ({report['summary']['match_rate']})")
         print(f"  Unmatched: {report['summary']['unmatched_files']}")
         
         # Migration readiness
-        print(f"\n{Fore.YELLOW}🚀 MIGRATION READINESS{Style.RESET_ALL}")
+        print(f"\n{YELLOW}🚀 MIGRATION READINESS{RESET}")
         readiness = report['migration_readiness']
         for factor, details in readiness['factors'].items():
             print(f"  {details['status']} {factor}: {details['value']}")
         print(f"\n  {readiness['overall']} (Score: {readiness['score']}/100)")
         
         # PDF Links
-        print(f"\n{Fore.YELLOW}🔗 PDF LINKS{Style.RESET_ALL}")
+        print(f"\n{YELLOW}🔗 PDF LINKS{RESET}")
         print(f"  Working: {report['pdf_links']['working']}")
         print(f"  Broken: {report['pdf_links']['broken']}")
         if report['pdf_links']['examples']:
@@ -429,7 +695,7 @@ class VaultAnalyzer:
         
         # Content patterns
         if report['content_patterns'].get('sample_size', 0) > 0:
-            print(f"\n{Fore.YELLOW}📝 CONTENT PATTERNS (sample of {report['content_patterns']['sample_size']}){Style.RESET_ALL}")
+            print(f"\n{YELLOW}📝 CONTENT PATTERNS ({report['content_patterns']['sample_size']} matched files){RESET}")
             patterns = report['content_patterns']
             print(f"  Files with BibTeX keys: {patterns['has_bibtex_key']}")
             print(f"  Files with user notes: {patterns['has_user_notes']}")
@@ -439,12 +705,12 @@ class VaultAnalyzer:
         
         # Unmatched files
         if report['unmatched_files']:
-            print(f"\n{Fore.YELLOW}❓ UNMATCHED FILES (first 10){Style.RESET_ALL}")
+            print(f"\n{YELLOW}❓ UNMATCHED FILES (first 10){RESET}")
             for filename in report['unmatched_files'][:10]:
                 print(f"  - {filename}")
         
         # Recommendations
-        print(f"\n{Fore.YELLOW}💡 RECOMMENDATIONS{Style.RESET_ALL}")
+        print(f"\n{YELLOW}💡 RECOMMENDATIONS{RESET}")
         for rec in report['recommendations']:
             print(f"  • {rec}")
 
@@ -474,11 +740,11 @@ def main():
     
     # Validate paths
     if not vault_path.exists():
-        print(f"{Fore.RED}Error: Vault path does not exist: {vault_path}{Style.RESET_ALL}")
+        print(f"{RED}Error: Vault path does not exist: {vault_path}{RESET}")
         return
     
     if not bibtex_path.exists():
-        print(f"{Fore.RED}Error: BibTeX file not found: {bibtex_path}{Style.RESET_ALL}")
+        print(f"{RED}Error: BibTeX file not found: {bibtex_path}{RESET}")
         return
     
     # Run analysis
@@ -486,7 +752,7 @@ def main():
     try:
         report = analyzer.run_analysis()
     except Exception as e:
-        print(f"\n{Fore.RED}Analysis failed: {e}{Style.RESET_ALL}")
+        print(f"\n{RED}Analysis failed: {e}{RESET}")
         raise
 
 
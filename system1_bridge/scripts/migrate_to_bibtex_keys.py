@@ -4,24 +4,215 @@ Migrate Obsidian articles from descriptive filenames to BibTeX keys.
 Preserves original filenames as aliases and maintains all links.
 """
 
+import os
 import re
+import sys
+import codecs
 import json
+import pickle
+import hashlib
 import shutil
 import argparse
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Set, Tuple, Optional
-import bibtexparser
-from colorama import init, Fore, Style
 
-init(autoreset=True)
+# Optional progress bar for long migrations
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Use orjson for writing the report when available, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Terminal colours; plain text when output is piped or redirected
+_USE_COLOR = sys.stdout.isatty()
+CYAN = '\x1b[36m' if _USE_COLOR else ''
+GREEN = '\x1b[32m' if _USE_COLOR else ''
+YELLOW = '\x1b[33m' if _USE_COLOR else ''
+RED = '\x1b[31m' if _USE_COLOR else ''
+RESET = '\x1b[0m' if _USE_COLOR else ''
+
+# Wiki link: target, then an optional '|alias' or '#heading' suffix.
+# Matched on raw bytes; these ASCII delimiters never occur inside a
+# multi-byte UTF-8 character, so notes are rewritten without decoding.
+LINK_RE = re.compile(rb'\[\[([^\]|#]+)([|#][^\]]*)?\]\]')
+# YAML frontmatter: '---' line, contents, closing '---' line (LF or CRLF)
+FRONTMATTER_RE = re.compile(rb'\A---\r?\n(.*?)^---[ \t]*(?:\r?\n|\Z)', re.DOTALL | re.MULTILINE)
+# Whole text between [[ and ]], as checked by validate_migration
+LINK_TEXT_RE = re.compile(r'\[\[([^\]]+)\]\]')
+YEAR_RE = re.compile(r'^\d{4}$')
+
+# Bytes read from the top of a note to see if it already has migration frontmatter
+FRONTMATTER_PROBE_BYTES = 256
+
+# Below this many files a process pool costs more to start than it saves
+_PARALLEL_THRESHOLD = 64
+
+
+def _init_colors():
+    """Enable ANSI colours on the Windows console (colorama is only needed there)"""
+    if sys.platform == 'win32':
+        from colorama import init
+        init(autoreset=True)
+
+
+def _iter_md(root):
+    """Yield the paths of all .md files under root (recursive)"""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.md'):
+                    yield entry.path
+
+
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _replace_link(m, mapping: Dict[bytes, bytes]) -> bytes:
+    """LINK_RE.sub callback pointing a link at its note's new name"""
+    new_name = mapping.get(m.group(1))
+    if new_name is None:
+        return m.group(0)
+    # Keep any '|alias' or '#heading' part of the link
+    return b'[[' + new_name + (m.group(2) or b'') + b']]'
+
+
+def _write_atomic(path: Path, data: bytes, fsync: bool = False):
+    """Write bytes to a temporary sibling and move it over path
+    
+    Replacing the file instead of truncating it gives it a new inode, so
+    the hardlinked backup made by _snapshot keeps the old contents.
+    Pass fsync=True to flush the data to disk before the move.
+    """
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _snapshot(src: Path, dst: Path):
+    """Snapshot a directory tree, as hardlinks where the platform allows
+    
+    Uses robocopy on Windows and `cp -al` elsewhere, then falls back to
+    shutil.copytree with hardlinks and finally to a plain copy.
+    """
+    try:
+        if sys.platform == 'win32':
+            result = subprocess.run(
+                ['robocopy', str(src), str(dst), '/MIR', '/NFL', '/NDL', '/NJH', '/NJS'],
+                stdout=subprocess.DEVNULL
+            )
+            # robocopy exit codes below 8 mean success
+            if result.returncode < 8:
+                return
+        else:
+            result = subprocess.run(['cp', '-al', f"{src}/.", str(dst)], stderr=subprocess.DEVNULL)
+            if result.returncode == 0:
+                return
+    except OSError:
+        pass
+    
+    shutil.rmtree(dst, ignore_errors=True)
+    try:
+        shutil.copytree(src, dst, copy_function=os.link)
+    except OSError:
+        # e.g. the backup is on another filesystem
+        shutil.rmtree(dst, ignore_errors=True)
+        shutil.copytree(src, dst)
+
+
+def _rewrite_file(path: str, mapping: Dict[bytes, bytes]) -> bool:
+    """Rewrite the mapped wiki links in one file; return True if it changed"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    new_data = LINK_RE.sub(partial(_replace_link, mapping=mapping), data)
+    if new_data == data:
+        return False
+    _write_atomic(Path(path), new_data)
+    return True
+
+
+@lru_cache(maxsize=None)
+def format_short_authors(author_string: str) -> str:
+    """Format authors as 'First et al.' or 'First & Second'
+    
+    Cached: many entries share the same author string.
+    """
+    if not author_string:
+        return ""
+    
+    authors = author_string.split(' and ')
+    if not authors:
+        return ""
+    
+    # Get last names
+    lastnames = []
+    for author in authors[:3]:  # Max 3 authors
+        lastname = extract_lastname(author)
+        if lastname:
+            lastnames.append(lastname)
+    
+    if len(lastnames) == 0:
+        return ""
+    elif len(lastnames) == 1:
+        return lastnames[0]
+    elif len(lastnames) == 2:
+        return f"{lastnames[0]} & {lastnames[1]}"
+    else:
+        return f"{lastnames[0]} et al."
+
+
+@lru_cache(maxsize=None)
+def extract_lastname(author: str) -> str:
+    """Extract lastname from author string"""
+    author = author.strip()
+    head, sep, _ = author.partition(',')
+    if sep:
+        # "Last, First" format
+        return head.strip()
+    # "First Last" format; rsplit splits on any whitespace like split() but
+    # builds at most two parts
+    return author.rsplit(None, 1)[-1] if author else ""
+
+
+def get_first_author_lastname(author_string: str) -> str:
+    """Get the last name of the first author"""
+    if not author_string:
+        return ""
+    
+    authors = author_string.split(' and ')
+    if authors:
+        return extract_lastname(authors[0])
+    return ""
+
 
 class VaultMigrator:
-    def __init__(self, vault_path: str, bibtex_path: str):
+    def __init__(self, vault_path: str, bibtex_path: str, fsync_per_file: bool = False):
         self.vault_path = Path(vault_path)
         self.bibtex_path = Path(bibtex_path)
         self.articles_dir = self.vault_path / "4 Articles"
         
+        # Flush every migrated file to disk, not just once per batch
+        self.fsync_per_file = fsync_per_file
+        
         # Migration tracking
         self.bibtex_entries = {}
         self.migration_plan = []
@@ -30,7 +221,7 @@ class VaultMigrator:
         
     def run_migration(self, dry_run: bool = True, batch_size: int = None):
         """Run the migration process"""
-        print(f"\n{Fore.CYAN}=== VAULT MIGRATION TO BIBTEX KEYS ==={Style.RESET_ALL}\n")
+        print(f"\n{CYAN}=== VAULT MIGRATION TO BIBTEX KEYS ==={RESET}\n")
         
         if batch_size:
             print(f"Mode: Batch processing ({batch_size} files per batch)")
@@ -57,7 +248,7 @@ class VaultMigrator:
         self.preview_changes()
         
         if dry_run:
-            print(f"\n{Fore.YELLOW}DRY RUN COMPLETE - No changes made{Style.RESET_ALL}")
+            print(f"\n{YELLOW}DRY RUN COMPLETE - No changes made{RESET}")
             print("Run with --execute to apply changes")
             return
         
@@ -66,16 +257,16 @@ class VaultMigrator:
         
         # Auto-confirm for small test migrations or batch mode
         if len(self.migration_plan) <= 5 or batch_size == 1:
-            print(f"{Fore.YELLOW}Auto-confirming migration of {len(self.migration_plan)} files (test mode){Style.RESET_ALL}")
+            print(f"{YELLOW}Auto-confirming migration of {len(self.migration_plan)} files (test mode){RESET}")
         elif batch_size and batch_size > 1:
             # Auto-confirm for batch mode
-            print(f"\n{Fore.YELLOW}Batch mode: Auto-confirming migration of {len(self.migration_plan)} files in batches of {batch_size}{Style.RESET_ALL}")
+            print(f"\n{YELLOW}Batch mode: Auto-confirming migration of {len(self.migration_plan)} files in batches of {batch_size}{RESET}")
             print(f"This will take approximately {len(self.migration_plan) // 10} minutes.")
         else:
             # For large migrations without batch, add progress option
-            print(f"\n{Fore.YELLOW}Ready to migrate {len(self.migration_plan)} files.{Style.RESET_ALL}")
+            print(f"\n{YELLOW}Ready to migrate {len(self.migration_plan)} files.{RESET}")
             print(f"This will take approximately {len(self.migration_plan) // 10} minutes.")
-            confirm = input(f"\n{Fore.YELLOW}Continue with migration? (y/N): {Style.RESET_ALL}")
+            confirm = input(f"\n{YELLOW}Continue with migration? (y/N): {RESET}")
             if confirm.lower() != 'y':
                 print("Migration cancelled")
                 return
@@ -96,8 +287,19 @@ class VaultMigrator:
     
     def parse_bibtex(self):
         """Parse BibTeX file"""
+        import bibtexparser
+        from bibtexparser.bparser import BibTexParser
+        
+        # Only keys, authors and years are used, so skip string
+        # interpolation and field homogenization
+        parser = BibTexParser(
+            common_strings=False,
+            interpolate_strings=False,
+            homogenize_fields=False,
+            ignore_nonstandard_types=True,
+        )
         with open(self.bibtex_path, 'r', encoding='utf-8') as f:
-            bib_database = bibtexparser.load(f)
+            bib_database = bibtexparser.load(f, parser=parser)
         
         for entry in bib_database.entries:
             key = entry.get('ID', '')
@@ -111,10 +313,11 @@ class VaultMigrator:
         self.backup_dir = self.vault_path / "claude_workspace" / "backups" / f"pre_migration_{timestamp}"
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         
-        # Copy articles directory
+        # Snapshot articles directory (hardlinks; migration only renames
+        # originals or replaces them with new files, never edits in place)
         backup_articles = self.backup_dir / "4 Articles"
         if self.articles_dir.exists():
-            shutil.copytree(self.articles_dir, backup_articles)
+            _snapshot(self.articles_dir, backup_articles)
             print(f"  ✓ Backed up to: {self.backup_dir}")
     
     def build_migration_plan(self):
@@ -122,12 +325,25 @@ class VaultMigrator:
         # Use the analyzer to match files
         from analyze_vault import VaultAnalyzer
         
+        # Reuse the entries loaded in parse_bibtex instead of reading the file again
         analyzer = VaultAnalyzer(self.vault_path, self.bibtex_path)
-        analyzer.parse_bibtex()
-        analyzer.scan_vault()
-        analyzer.match_files()
+        analyzer.parse_bibtex(list(self.bibtex_entries.values()))
         
-        for md_file, bibtex_entry in analyzer.matched_files:
+        # Matching is the slow part of planning; reuse it while the inputs are unchanged
+        cache_path = self.match_cache_path()
+        if cache_path is not None and cache_path.exists():
+            analyzer.matched_files, analyzer.unmatched_files = pickle.loads(cache_path.read_bytes())
+            print(f"  ✓ Reusing vault matches from {cache_path.name}")
+        else:
+            analyzer.scan_vault()
+            analyzer.match_files()
+            if cache_path is not None:
+                self.save_match_cache(cache_path, analyzer.matched_files, analyzer.unmatched_files)
+        
+        for filename, entry_key in analyzer.matched_files:
+            md_file = analyzer.articles_dir / filename
+            bibtex_entry = analyzer.get_matched_entry(entry_key)
+            
             # Generate new filename
             new_name = f"{bibtex_entry['key']}.md"
             new_path = md_file.parent / new_name
@@ -151,6 +367,42 @@ class VaultMigrator:
         print(f"  ✓ Planning to migrate {len(self.migration_plan)} files")
         print(f"  ℹ {len(analyzer.unmatched_files)} files will not be migrated (no BibTeX match)")
     
+    def match_cache_path(self) -> Optional[Path]:
+        """Return the match cache file for the current vault and BibTeX state
+        
+        The name hashes the BibTeX file's size and mtime, the articles
+        folder's mtime (changes on add/remove/rename), the number of notes
+        and their newest mtime, so any edit points at a new cache file.
+        """
+        if not self.articles_dir.exists():
+            return None
+        
+        import analyze_vault
+        bib_stat = self.bibtex_path.stat()
+        note_count = 0
+        newest_note = 0
+        with os.scandir(self.articles_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.md'):
+                    note_count += 1
+                    newest_note = max(newest_note, entry.stat().st_mtime_ns)
+        
+        state = (
+            bib_stat.st_size, bib_stat.st_mtime_ns,
+            self.articles_dir.stat().st_mtime_ns, note_count, newest_note,
+            # Matching rules changed
+            os.stat(analyze_vault.__file__).st_mtime_ns,
+        )
+        key = hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
+        return self.vault_path / "claude_workspace" / "cache" / f"match_{key}.pkl"
+    
+    def save_match_cache(self, cache_path: Path, matched_files: List, unmatched_files: List):
+        """Store (matched_files, unmatched_files), replacing older match caches"""
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        for old_cache in cache_path.parent.glob("match_*.pkl"):
+            old_cache.unlink()
+        cache_path.write_bytes(pickle.dumps((matched_files, unmatched_files), protocol=pickle.HIGHEST_PROTOCOL))
+    
     def generate_aliases(self, md_file: Path, bibtex_entry: Dict) -> List[str]:
         """Generate minimal, useful aliases for a file"""
         aliases = []
@@ -160,11 +412,11 @@ class VaultMigrator:
         aliases.append(original_name)
         
         # 2. Short citation only if year is valid (e.g., "Sporrong et al. 2024")
-        authors = self.format_short_authors(bibtex_entry.get('author', ''))
+        authors = format_short_authors(bibtex_entry.get('author', ''))
         year = bibtex_entry.get('year', '')
         
         # Only add citation if we have valid year (4 digits)
-        if authors and year and re.match(r'^\d{4}$', str(year)):
+        if authors and year and YEAR_RE.match(year):
             short_cite = f"{authors} {year}"
             aliases.append(short_cite)
         
@@ -173,93 +425,18 @@ class VaultMigrator:
         
         return aliases
     
-    def format_short_authors(self, author_string: str) -> str:
-        """Format authors as 'First et al.' or 'First & Second'"""
-        if not author_string:
-            return ""
-        
-        authors = author_string.split(' and ')
-        if not authors:
-            return ""
-        
-        # Get last names
-        lastnames = []
-        for author in authors[:3]:  # Max 3 authors
-            lastname = self.extract_lastname(author)
-            if lastname:
-                lastnames.append(lastname)
-        
-        if len(lastnames) == 0:
-            return ""
-        elif len(lastnames) == 1:
-            return lastnames[0]
-        elif len(lastnames) == 2:
-            return f"{lastnames[0]} & {lastnames[1]}"
-        else:
-            return f"{lastnames[0]} et al."
-    
-    def extract_lastname(self, author: str) -> str:
-        """Extract lastname from author string"""
-        author = author.strip()
-        if ',' in author:
-            # "Last, First" format
-            return author.split(',')[0].strip()
-        else:
-            # "First Last" format
-            parts = author.split()
-            return parts[-1] if parts else ""
-    
-    def get_first_author_lastname(self, author_string: str) -> str:
-        """Get the last name of the first author"""
-        if not author_string:
-            return ""
-        
-        authors = author_string.split(' and ')
-        if authors:
-            return self.extract_lastname(authors[0])
-        return ""
-    
-    def extract_title_keywords(self, title: str) -> str:
-        """Extract significant keywords from title"""
-        # Remove special characters and lowercase
-        title = re.sub(r'[^\w\s-]', '', title.lower())
-        
-        # Common words to skip
-        stopwords = {
-            'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were'
-        }
-        
-        # Extract words
-        words = [w for w in title.split() if w not in stopwords and len(w) > 2]
-        
-        # Take first 3-4 significant words
-        keywords = words[:4]
-        
-        return ' '.join(keywords) if keywords else ""
-    
-    def clean_title_for_alias(self, title: str) -> str:
-        """Clean title for use as alias"""
-        # Remove BibTeX formatting
-        title = re.sub(r'[{}]', '', title)
-        # Remove special characters but keep spaces
-        title = re.sub(r'[^\w\s-]', '', title)
-        # Normalize whitespace
-        title = ' '.join(title.split())
-        return title
-    
     def preview_changes(self):
         """Preview the changes that will be made"""
         if not self.migration_plan:
             print("  No files to migrate")
             return
         
-        print(f"\n  {Fore.YELLOW}MIGRATION PREVIEW:{Style.RESET_ALL}")
+        print(f"\n  {YELLOW}MIGRATION PREVIEW:{RESET}")
         
         # Show first 10 migrations
         for i, plan in enumerate(self.migration_plan[:10]):
-            print(f"\n  [{i+1}] {Fore.CYAN}{plan['old_name']}{Style.RESET_ALL}")
-            print(f"      → {Fore.GREEN}{plan['bibtex_key']}.md{Style.RESET_ALL}")
+            print(f"\n  [{i+1}] {CYAN}{plan['old_name']}{RESET}")
+            print(f"      → {GREEN}{plan['bibtex_key']}.md{RESET}")
             print(f"      Aliases: {', '.join(plan['aliases'][:3])}")
         
         if len(self.migration_plan) > 10:
@@ -281,25 +458,11 @@ class VaultMigrator:
                 end_idx = min(start_idx + batch_size, total)
                 batch = self.migration_plan[start_idx:end_idx]
                 
-                print(f"\n{Fore.YELLOW}=== Batch {batch_num + 1}/{num_batches} ({start_idx + 1}-{end_idx} of {total}) ==={Style.RESET_ALL}")
+                print(f"\n{YELLOW}=== Batch {batch_num + 1}/{num_batches} ({start_idx + 1}-{end_idx} of {total}) ==={RESET}")
                 
-                for j, plan in enumerate(batch):
-                    i = start_idx + j
-                    try:
-                        print(f"  [{i+1}/{total}] Migrating {plan['old_name'][:60]}...", end='', flush=True)
-                        
-                        # Add aliases to file
-                        self.add_aliases_to_file(plan['old_path'], plan['aliases'], plan['bibtex_key'])
-                        
-                        # Rename file
-                        plan['old_path'].rename(plan['new_path'])
-                        
-                        success_count += 1
-                        print(f" {Fore.GREEN}✓{Style.RESET_ALL}")
-                        
-                    except Exception as e:
-                        error_count += 1
-                        print(f" {Fore.RED}✗ {e}{Style.RESET_ALL}")
+                succeeded, failed = self.migrate_files(batch)
+                success_count += succeeded
+                error_count += failed
                 
                 # Pause between batches
                 if batch_num < num_batches - 1:
@@ -307,95 +470,145 @@ class VaultMigrator:
                     time.sleep(3)
         else:
             # Regular processing
-            for i, plan in enumerate(self.migration_plan):
-                try:
-                    # Show progress every 50 files for large migrations
-                    if i > 0 and i % 50 == 0:
-                        print(f"\n  Progress: {i}/{len(self.migration_plan)} files migrated ({i/len(self.migration_plan)*100:.1f}%)\n")
-                    
-                    print(f"  [{i+1}/{len(self.migration_plan)}] Migrating {plan['old_name'][:60]}...", end='', flush=True)
-                    
-                    # Add aliases to file
-                    self.add_aliases_to_file(plan['old_path'], plan['aliases'], plan['bibtex_key'])
-                    
-                    # Rename file
-                    plan['old_path'].rename(plan['new_path'])
-                    
-                    success_count += 1
-                    print(f" {Fore.GREEN}✓{Style.RESET_ALL}")
-                    
-                except Exception as e:
-                    error_count += 1
-                    print(f" {Fore.RED}✗ {e}{Style.RESET_ALL}")
+            success_count, error_count = self.migrate_files(self.migration_plan)
         
         print(f"\n  Summary: {success_count} succeeded, {error_count} failed")
     
+    def migrate_files(self, plans: List[Dict]) -> Tuple[int, int]:
+        """Migrate the files in plans, returning (succeeded, failed) counts
+        
+        Progress is shown with a tqdm bar when tqdm is installed, otherwise
+        as a line every 50 files; only failures are printed per file.
+        """
+        success_count = 0
+        error_count = 0
+        total = len(plans)
+        
+        if tqdm is not None:
+            progress = tqdm(plans, unit='file', leave=False)
+            log = tqdm.write
+        else:
+            progress = plans
+            log = print
+        
+        for i, plan in enumerate(progress):
+            # Show progress every 50 files for large migrations
+            if tqdm is None and i > 0 and i % 50 == 0:
+                print(f"  Progress: {i}/{total} files migrated ({i/total*100:.1f}%)")
+            
+            try:
+                self.migrate_file(plan)
+                success_count += 1
+            except Exception as e:
+                error_count += 1
+                log(f"  {RED}✗ {plan['old_name'][:60]}: {e}{RESET}")
+        
+        self.sync_to_disk()
+        return success_count, error_count
+    
+    def sync_to_disk(self):
+        """Flush a batch's rewrites and renames to disk in one go
+        
+        One sync per batch instead of waiting on the disk for every file.
+        Windows has no os.sync(); there only --fsync-per-file flushes.
+        """
+        if hasattr(os, 'sync'):
+            os.sync()
+    
+    def migrate_file(self, plan: Dict):
+        """Add aliases to one file and rename it to its BibTeX key
+        
+        Files that already carry this key's frontmatter (from an earlier,
+        interrupted run) are only renamed.
+        """
+        old_path, new_path = plan['old_path'], plan['new_path']
+        
+        # Another note already has this key's name (e.g. two files matched the same entry)
+        if new_path.exists():
+            raise FileExistsError(f"{new_path.name} already exists")
+        
+        with open(old_path, 'rb') as f:
+            head = f.read(FRONTMATTER_PROBE_BYTES)
+        if head.startswith(codecs.BOM_UTF8):
+            head = head[len(codecs.BOM_UTF8):]
+        key_line = f"\nbibtex_key: {plan['bibtex_key']}\n".encode('utf-8')
+        if not (head.startswith(b'---') and key_line in head.replace(b'\r\n', b'\n')):
+            self.add_aliases_to_file(old_path, plan['aliases'], plan['bibtex_key'])
+        
+        os.replace(old_path, new_path)
+    
     def add_aliases_to_file(self, file_path: Path, aliases: List[str], bibtex_key: str):
         """Add YAML frontmatter with aliases to file"""
-        content = file_path.read_text(encoding='utf-8')
-        
-        # Create YAML frontmatter
-        yaml_content = "---\n"
-        yaml_content += "aliases:\n"
-        for alias in aliases:
-            # Escape quotes in aliases
-            alias_escaped = alias.replace('"', '\\"')
-            yaml_content += f'  - "{alias_escaped}"\n'
-        yaml_content += "tags:\n"
-        yaml_content += "  - from_paperpile\n"
-        yaml_content += f"bibtex_key: {bibtex_key}\n"
-        yaml_content += "---\n\n"
-        
-        # Check if file already has frontmatter
-        if content.startswith('---'):
-            # Update existing frontmatter
-            end_marker = content.find('---', 3)
-            if end_marker > 0:
-                # Parse existing frontmatter and merge
-                existing_fm = content[3:end_marker].strip()
-                # For now, replace entirely (could be smarter about merging)
-                content = yaml_content + content[end_marker + 3:].lstrip()
-            else:
-                # Malformed frontmatter, prepend new
-                content = yaml_content + content
-        else:
-            # Add new frontmatter
-            content = yaml_content + content
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if data.startswith(codecs.BOM_UTF8):
+            data = data[len(codecs.BOM_UTF8):]
+        eol = b'\r\n' if b'\r\n' in data else b'\n'
+        
+        # Create YAML frontmatter, joined once
+        yaml_parts = ["---\naliases:\n"]
+        # Escape quotes in aliases
+        yaml_parts.extend('  - "{}"\n'.format(alias.replace('"', '\\"')) for alias in aliases)
+        yaml_parts.append(f"tags:\n  - from_paperpile\nbibtex_key: {bibtex_key}\n---\n\n")
+        yaml_content = ''.join(yaml_parts).encode('utf-8')
+        if eol != b'\n':
+            yaml_content = yaml_content.replace(b'\n', eol)
+        
+        # Existing frontmatter is replaced entirely (could be smarter about merging)
+        fm_match = FRONTMATTER_RE.match(data)
+        body = data[fm_match.end():].lstrip() if fm_match else data
         
         # Ensure BibTeX key is in the file
-        if 'BibTeX Key:' not in content and bibtex_key:
+        parts = [yaml_content, body]
+        if bibtex_key and b'BibTeX Key:' not in body:
             # Find where to insert it (after Reference Information header if exists)
-            ref_section = content.find('## Reference Information')
-            if ref_section > 0:
+            ref_section = body.find(b'## Reference Information')
+            if ref_section >= 0:
                 # Find next newline after header
-                insert_pos = content.find('\n', ref_section) + 1
-                content = content[:insert_pos] + f"**BibTeX Key:** {bibtex_key}\n" + content[insert_pos:]
+                insert_pos = body.find(b'\n', ref_section) + 1 or len(body)
+                key_line = f"**BibTeX Key:** {bibtex_key}".encode('utf-8') + eol
+                if insert_pos == len(body) and not body.endswith(b'\n'):
+                    key_line = eol + key_line
+                parts[1:] = [body[:insert_pos], key_line, body[insert_pos:]]
         
-        file_path.write_text(content, encoding='utf-8')
+        _write_atomic(file_path, b''.join(parts), fsync=self.fsync_per_file)
+    
+    def index_link_targets(self) -> Dict[bytes, List[str]]:
+        """Map each wiki link target (UTF-8 bytes) in the vault to the paths of files linking to it"""
+        link_index = defaultdict(list)
+        for md_path in _iter_md(self.vault_path):
+            with open(md_path, 'rb') as f:
+                data = f.read()
+            for target in {m.group(1) for m in LINK_RE.finditer(data)}:
+                link_index[target].append(md_path)
+        return link_index
     
     def update_all_links(self):
         """Update all wiki links to renamed files"""
-        # Build mapping of old names to new names
-        name_mapping = {}
-        for plan in self.migration_plan:
-            old_link = f"[[{plan['old_name']}]]"
-            new_link = f"[[{plan['bibtex_key']}]]"
-            name_mapping[old_link] = new_link
-        
-        # Update links in all markdown files
-        updated_files = 0
-        for md_file in self.vault_path.rglob("*.md"):
-            content = md_file.read_text(encoding='utf-8')
-            original_content = content
-            
-            # Replace all mapped links
-            for old_link, new_link in name_mapping.items():
-                content = content.replace(old_link, new_link)
-            
-            # Write back if changed
-            if content != original_content:
-                md_file.write_text(content, encoding='utf-8')
-                updated_files += 1
+        # Build mapping of old names to new names, encoded once for the bytes regex
+        name_mapping = {
+            plan['old_name'].encode('utf-8'): plan['bibtex_key'].encode('utf-8')
+            for plan in self.migration_plan
+        }
+        
+        # Only files that link to a renamed note need rewriting
+        link_index = self.index_link_targets()
+        affected_files = {}
+        for old_name in name_mapping:
+            for md_path in link_index.get(old_name, ()):
+                affected_files[md_path] = None
+        affected_files = list(affected_files)
+        
+        # Rewrite all mapped links in one pass per file, in parallel for larger batches
+        rewrite = partial(_rewrite_file, mapping=name_mapping)
+        if len(affected_files) < _PARALLEL_THRESHOLD:
+            results = map(rewrite, affected_files)
+        else:
+            workers = os.cpu_count() or 1
+            chunksize = max(1, len(affected_files) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(rewrite, affected_files, chunksize=chunksize))
+        updated_files = sum(results)
         
         print(f"  ✓ Updated links in {updated_files} files")
     
@@ -408,9 +621,14 @@ class VaultMigrator:
             'broken_links': 0
         }
         
+        # One directory listing instead of a stat per file and per link
+        with os.scandir(self.articles_dir) as it:
+            md_files = [(entry.name[:-3], entry.path) for entry in it if entry.name.endswith('.md')]
+        existing = {name for name, _path in md_files}
+        
         # Check that new files exist
         for plan in self.migration_plan:
-            if plan['new_path'].exists():
+            if plan['bibtex_key'] in existing or plan['new_path'].exists():
                 validation_results['files_exist'] += 1
                 
                 # Check for aliases
@@ -419,18 +637,18 @@ class VaultMigrator:
                     validation_results['aliases_added'] += 1
         
         # Quick check for broken links (sample)
-        sample_files = list(self.articles_dir.glob("*.md"))[:20]
-        for md_file in sample_files:
-            content = md_file.read_text(encoding='utf-8')
-            links = re.findall(r'\[\[([^\]]+)\]\]', content)
+        for _name, md_path in md_files[:20]:
+            content = _read_text(md_path)
+            links = LINK_TEXT_RE.findall(content)
             for link in links:
                 if not link.endswith('.pdf'):  # Skip PDF links
-                    link_path = self.articles_dir / f"{link}.md"
-                    if not link_path.exists():
+                    # Misses still get a real check, for subfolder links and
+                    # case-insensitive filesystems
+                    if link not in existing and not (self.articles_dir / f"{link}.md").exists():
                         validation_results['broken_links'] += 1
         
         # Print validation results
-        print(f"\n  {Fore.YELLOW}VALIDATION RESULTS:{Style.RESET_ALL}")
+        print(f"\n  {YELLOW}VALIDATION RESULTS:{RESET}")
         print(f"  Files migrated: {validation_results['files_migrated']}")
         print(f"  Files exist: {validation_results['files_exist']} ✓")
         print(f"  Aliases added: {validation_results['aliases_added']} ✓")
@@ -456,15 +674,19 @@ class VaultMigrator:
         report_path = self.vault_path / Path(__file__).parent.parent / "export" / f"migration_report_{datetime.now():%Y%m%d_%H%M%S}.json"
         report_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            report_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        else:
+            # json.dump streams the encoded chunks; no indent keeps large reports small
+            with open(report_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                json.dump(report, f, ensure_ascii=False)
         
         print(f"\n  📄 Migration report saved to: {report_path}")
         
         # Print summary
-        print(f"\n{Fore.GREEN}{'='*60}{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}MIGRATION COMPLETE{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}{'='*60}{Style.RESET_ALL}")
+        print(f"\n{GREEN}{'='*60}{RESET}")
+        print(f"{GREEN}MIGRATION COMPLETE{RESET}")
+        print(f"{GREEN}{'='*60}{RESET}")
         print(f"\n  ✓ Migrated {len(self.migration_plan)} files to BibTeX keys")
         print(f"  ✓ Original filenames preserved as aliases")
         print(f"  ✓ All internal links updated")
@@ -509,8 +731,14 @@ def main():
         metavar='SIZE',
         help='Process files in batches of SIZE (e.g., --batch 50)'
     )
+    parser.add_argument(
+        '--fsync-per-file',
+        action='store_true',
+        help='Flush every migrated file to disk instead of once per batch (slower, safer on power loss)'
+    )
     
     args = parser.parse_args()
+    _init_colors()
     
     # Determine mode
     dry_run = not args.execute
@@ -521,21 +749,21 @@ def main():
     
     # Validate paths
     if not vault_path.exists():
-        print(f"{Fore.RED}Error: Vault path does not exist: {vault_path}{Style.RESET_ALL}")
+        print(f"{RED}Error: Vault path does not exist: {vault_path}{RESET}")
         return
     
     if not bibtex_path.exists():
-        print(f"{Fore.RED}Error: BibTeX file not found: {bibtex_path}{Style.RESET_ALL}")
+        print(f"{RED}Error: BibTeX file not found: {bibtex_path}{RESET}")
         return
     
     # Run migration
-    migrator = VaultMigrator(vault_path, bibtex_path)
+    migrator = VaultMigrator(vault_path, bibtex_path, fsync_per_file=args.fsync_per_file)
     try:
         migrator.run_migration(dry_run=dry_run, batch_size=args.batch)
     except KeyboardInterrupt:
-        print(f"\n{Fore.YELLOW}Migration interrupted by user{Style.RESET_ALL}")
+        print(f"\n{YELLOW}Migration interrupted by user{RESET}")
     except Exception as e:
-        print(f"\n{Fore.RED}Migration failed: {e}{Style.RESET_ALL}")
+        print(f"\n{RED}Migration failed: {e}{RESET}")
         raise
 
 
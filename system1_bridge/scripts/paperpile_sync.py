@@ -4,43 +4,258 @@ Paperpile to Obsidian synchronization with content provenance tracking.
 Updates only Paperpile metadata while preserving user content.
 """
 
+import io
+import os
+import mmap
 import re
+import sys
 import json
+import hashlib
 import argparse
 import logging
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, Final, List, Set, Tuple, Optional
 import bibtexparser
+from bibtexparser.bparser import BibTexParser
 from colorama import init, Fore, Style
 
+# Use orjson for writing the report when available, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 init(autoreset=True)
 
-# Configure logging
+# Configure logging; file records are buffered and written in groups.
+# basicConfig only formats the handlers it is given, so the wrapped file
+# handler gets its formatter here
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_log_file_handler = logging.FileHandler('paperpile_sync.log', delay=True)
+_log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('paperpile_sync.log'),
+        logging.handlers.MemoryHandler(
+            capacity=512,
+            flushLevel=logging.ERROR,
+            target=_log_file_handler
+        ),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Content markers for provenance tracking
+PAPERPILE_START: Final = sys.intern("<!-- PAPERPILE METADATA START -->")
+PAPERPILE_END: Final = sys.intern("<!-- PAPERPILE METADATA END -->")
+USER_START: Final = sys.intern("<!-- USER CONTENT START -->")
+USER_END: Final = sys.intern("<!-- USER CONTENT END -->")
+SCRIPT_START: Final = sys.intern("<!-- SCRIPT GENERATED START -->")
+SCRIPT_END: Final = sys.intern("<!-- SCRIPT GENERATED END -->")
+SECTION_MARKERS = (
+    ('paperpile', PAPERPILE_START, PAPERPILE_END),
+    ('user', USER_START, USER_END),
+    ('script', SCRIPT_START, SCRIPT_END)
+)
+
+# Compiled once: these run for every article in the BibTeX export
+YEAR_RE = re.compile(r'(\d{4})')
+YEAR_FULL_RE = re.compile(r'^\d{4}$')
+PDF_RE = re.compile(r'(All Papers/[^:;]+\.pdf)')
+TAG_RE = re.compile(r'#(\S+)')
+FRONTMATTER_KEY_RE = re.compile(r'bibtex_key:\s*(\S+)')
+BODY_KEY_RE = re.compile(r'BibTeX Key:\s*(\S+)')
+WS_RE = re.compile(r'\s+')
+# Legacy note sections and metadata lines that convert_legacy_file regenerates
+LEGACY_SECTION_RE = re.compile(
+    r'## (?:Metadata|Abstract|Additional Information|Zotero Information|Collections)'
+)
+LEGACY_FIELD_RE = re.compile(
+    r'\*\*(?:Type|Author\(s\)|Date|Publisher|Pages|ISBN|Key|Item ID|Date Added|Date Modified):\*\*'
+)
+# str.translate table that deletes BibTeX braces
+BRACE_TRANS = str.maketrans('', '', '{}')
+HASH_RE = re.compile(rb'^paperpile_hash: ([0-9a-f]+)\r?$', re.MULTILINE)
+
+# BibTeX fields that end up in the generated frontmatter, title and metadata;
+# parse_bibtex drops all others
+HASH_FIELDS = (
+    'ID', 'ENTRYTYPE', 'title', 'author', 'year', 'journal', 'journaltitle',
+    'publisher', 'doi', 'abstract', 'volume', 'number', 'issue', 'pages',
+    'url', 'file', 'language', 'note', 'keywords'
+)
+
+# The frontmatter (and so paperpile_hash) sits well within this many bytes
+HASH_PROBE_BYTES = 2048
+
+# Notes at least this large are decoded straight from a memory map
+MMAP_MIN_BYTES = 64 * 1024
+
+# Below this many articles a process pool costs more than it saves
+_PARALLEL_THRESHOLD = 64
+
+# Progress lines are written to the console in groups of this many articles
+_PROGRESS_EVERY = 50
+
+# Per-worker syncer, set once by the pool initializer
+_worker_syncer = None
+
+
+def _index_pdfs(root: Path, prefix: str) -> Set[str]:
+    """Collect '<prefix>/<relative path>' for every PDF under root in one walk"""
+    found = set()
+    if not root.is_dir():
+        return found
+    stack = [(str(root), prefix)]
+    while stack:
+        path, rel = stack.pop()
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, f"{rel}/{entry.name}"))
+                elif entry.name.endswith('.pdf'):
+                    found.add(f"{rel}/{entry.name}")
+    return found
+
+
+def _decode_text(data) -> str:
+    """Decode a UTF-8 buffer with universal newlines, as Path.read_text would"""
+    text = str(data, 'utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _write_atomic(path: Path, content: str):
+    """Write text to a temporary sibling and move it over path
+    
+    An interrupted sync then leaves either the old or the new note, never
+    a truncated one. Nothing is fsynced here; sync_articles flushes once.
+    """
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _scan_sections(content: str) -> Tuple[Dict[str, str], str]:
+    """Split a note into its marked sections and the text outside them
+    
+    One left-to-right pass over the marker positions: each step takes the
+    nearest start marker whose end marker follows it, keeps the first block
+    of each kind and collects the gaps between blocks as unmarked text.
+    Returns the sections (plus frontmatter) and the unmarked text without
+    frontmatter and title, or "" if it is too short to be worth keeping.
+    """
+    sections = {}
+    pos = 0
+    
+    # Extract frontmatter
+    if content.startswith('---'):
+        fm_end = content.find('---', 3)
+        if fm_end > 0:
+            sections['frontmatter'] = content[3:fm_end].strip()
+            pos = fm_end + 3
+    
+    # Markers are literal strings, so plain find() is enough to locate them
+    pending = {name: (content.find(start, pos), start, end)
+               for name, start, end in SECTION_MARKERS}
+    gaps = []
+    while True:
+        found = [(i, name) for name, (i, _, _) in pending.items() if i >= 0]
+        if not found:
+            break
+        i, name = min(found)
+        _, start, end = pending[name]
+        j = content.find(end, i + len(start))
+        if j < 0:
+            # No end marker after this start, nor after any later one
+            del pending[name]
+            continue
+        
+        gaps.append(content[pos:i])
+        if name not in sections:
+            sections[name] = content[i + len(start):j].strip()
+        pos = j + len(end)
+        
+        # Look again for start markers the block just consumed
+        for other, (k, other_start, other_end) in pending.items():
+            if 0 <= k < pos:
+                pending[other] = (content.find(other_start, pos), other_start, other_end)
+    gaps.append(content[pos:])
+    
+    # A block nested in a malformed one (say, a lost end marker) is skipped
+    # by the scan; look for it directly so its text is not dropped
+    for name, start, end in SECTION_MARKERS:
+        if name not in sections:
+            i = content.find(start)
+            j = content.find(end, i + len(start)) if i >= 0 else -1
+            if j >= 0:
+                sections[name] = content[i + len(start):j].strip()
+    
+    # Remove title (first line starting with #)
+    lines = ''.join(gaps).strip().split('\n')
+    if lines and lines[0].startswith('#'):
+        lines = lines[1:]
+    
+    unmarked = '\n'.join(lines).strip()
+    
+    # Don't include if it's just whitespace or very short
+    if len(unmarked) < 10:
+        unmarked = ""
+    
+    return sections, unmarked
+
+
+@lru_cache(maxsize=None)
+def _link_author(author: str) -> str:
+    """Format one BibTeX author as a [[Last, First]] wiki link
+    
+    Cached: the same people turn up across many entries.
+    """
+    author = author.strip()
+    if ',' in author:
+        return f"[[{author}]]"
+    # Convert "First Last" to "Last, First"
+    parts = author.split()
+    if len(parts) >= 2:
+        return f"[[{parts[-1]}, {' '.join(parts[:-1])}]]"
+    return f"[[{author}]]"
+
+
+def _init_worker(syncer: 'PaperpileSync'):
+    global _worker_syncer
+    _worker_syncer = syncer
+
+
+def _sync_chunk(entries: List[Dict]) -> Tuple[Dict, List[str]]:
+    """Sync a slice of entries in a worker; return its stats and each entry's output"""
+    syncer = _worker_syncer
+    syncer.sync_stats = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
+    outputs = [syncer.sync_article_captured(entry) for entry in entries]
+    # Pool workers exit without logging.shutdown(), so flush buffered records
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+    return syncer.sync_stats, outputs
+
 class PaperpileSync:
-    def __init__(self, vault_path: str, bibtex_path: str):
+    def __init__(self, vault_path: str, bibtex_path: str, strict_orphan: bool = False):
         self.vault_path = Path(vault_path)
         self.bibtex_path = Path(bibtex_path)
+        # Read orphan candidates to look for a BibTeX key in their content
+        self.strict_orphan = strict_orphan
         self.articles_dir = self.vault_path / "4 Articles"
         self.pdf_base = self.vault_path / "9 Paperpile"
-        
-        # Content markers for provenance tracking
-        self.PAPERPILE_START = "<!-- PAPERPILE METADATA START -->"
-        self.PAPERPILE_END = "<!-- PAPERPILE METADATA END -->"
-        self.USER_START = "<!-- USER CONTENT START -->"
-        self.USER_END = "<!-- USER CONTENT END -->"
-        self.SCRIPT_START = "<!-- SCRIPT GENERATED START -->"
-        self.SCRIPT_END = "<!-- SCRIPT GENERATED END -->"
+        self.pdf_root = self.pdf_base / "Paperpile"
+        # One walk up front instead of a stat per BibTeX file field
+        self.pdf_index = _index_pdfs(self.pdf_root / "All Papers", "All Papers")
         
         # Sync tracking
         self.bibtex_entries = {}
@@ -67,9 +282,7 @@ class PaperpileSync:
             entries_to_process = entries_to_process[:test_limit]
             print(f"   (Limited to {test_limit} articles for testing)")
         
-        for i, entry in enumerate(entries_to_process, 1):
-            print(f"\n[{i}/{len(entries_to_process)}] Processing {entry['ID']}...")
-            self.sync_article(entry)
+        self.sync_articles(entries_to_process)
         
         # Step 3: Find orphaned files
         print("\n3. Checking for orphaned files...")
@@ -81,24 +294,95 @@ class PaperpileSync:
     
     def parse_bibtex(self):
         """Parse BibTeX file and extract all entries"""
+        # Paperpile exports carry no @string macros, so skip string
+        # interpolation and field homogenization
+        parser = BibTexParser(
+            common_strings=False,
+            interpolate_strings=False,
+            homogenize_fields=False,
+            ignore_nonstandard_types=True,
+        )
         with open(self.bibtex_path, 'r', encoding='utf-8') as f:
-            bib_database = bibtexparser.load(f)
+            bib_database = bibtexparser.load(f, parser=parser)
         
         for entry in bib_database.entries:
             key = entry.get('ID', '')
             if key:
+                # Keep only the fields the sync uses; the entries are copied
+                # to every worker process
+                kept = {field: entry[field] for field in HASH_FIELDS if field in entry}
+                
                 # Extract year from date field if not present
-                if 'year' not in entry and 'date' in entry:
-                    date = entry['date']
+                if 'year' not in kept and 'date' in entry:
                     # Extract year from date like "2024-09-05"
-                    year_match = re.search(r'(\d{4})', date)
+                    year_match = YEAR_RE.search(entry['date'])
                     if year_match:
-                        entry['year'] = year_match.group(1)
+                        kept['year'] = year_match.group(1)
                 
-                self.bibtex_entries[key] = entry
+                self.bibtex_entries[key] = kept
         
         print(f"  ✓ Loaded {len(self.bibtex_entries)} BibTeX entries")
     
+    def sync_articles(self, entries: List[Dict]):
+        """Sync all entries, fanning out to a process pool for large exports"""
+        total = len(entries)
+        if total < _PARALLEL_THRESHOLD:
+            outputs = map(self.sync_article_captured, entries)
+        else:
+            outputs = self.sync_in_pool(entries)
+        
+        # Each article's output is captured and written to the console in
+        # groups rather than line by line
+        pending = []
+        try:
+            for i, (entry, output) in enumerate(zip(entries, outputs), 1):
+                pending.append(f"\n[{i}/{total}] Processing {entry['ID']}...\n")
+                pending.append(output)
+                if i % _PROGRESS_EVERY == 0:
+                    sys.stdout.write(''.join(pending))
+                    sys.stdout.flush()
+                    pending.clear()
+        finally:
+            sys.stdout.write(''.join(pending))
+            sys.stdout.flush()
+        
+        self.sync_to_disk()
+    
+    def sync_in_pool(self, entries: List[Dict]):
+        """Sync entries in worker processes, yielding each one's output in order"""
+        # Articles are independent files, so workers sync them in parallel and
+        # hand their console output back to be printed in the original order
+        workers = os.cpu_count() or 1
+        size = max(1, len(entries) // (4 * workers))
+        chunks = [entries[i:i + size] for i in range(0, len(entries), size)]
+        
+        # Forked workers inherit the MemoryHandler buffer; flush it first so
+        # records logged so far are not written again by every worker
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            for stats, outputs in executor.map(_sync_chunk, chunks):
+                for key, count in stats.items():
+                    self.sync_stats[key] += count
+                yield from outputs
+    
+    def sync_article_captured(self, entry: Dict) -> str:
+        """Sync a single article and return what it printed"""
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            self.sync_article(entry)
+        return buf.getvalue()
+    
+    def sync_to_disk(self):
+        """Flush all written articles to disk in one go
+        
+        Windows has no os.sync(); there the OS flushes in its own time.
+        """
+        if hasattr(os, 'sync'):
+            os.sync()
+    
     def sync_article(self, entry: Dict):
         """Sync a single article"""
         try:
@@ -123,16 +407,33 @@ class PaperpileSync:
         """Create a new article file"""
         content = self.generate_article_content(entry)
         
-        file_path.write_text(content, encoding='utf-8')
+        _write_atomic(file_path, content)
         self.sync_stats['created'] += 1
         print(f"  {Fore.GREEN}✓ Created new article{Style.RESET_ALL}")
     
     def update_article(self, file_path: Path, entry: Dict):
         """Update existing article, preserving user content"""
-        existing_content = file_path.read_text(encoding='utf-8')
+        # Fast path: the entry is unchanged since the file was last written
+        with open(file_path, 'rb') as f:
+            head = f.read(HASH_PROBE_BYTES)
+            hash_match = HASH_RE.search(head) if head.startswith(b'---') else None
+            if hash_match and hash_match.group(1).decode('ascii') == self.entry_hash(entry):
+                print(f"  → No changes needed")
+                logger.info(f"  No changes needed for {file_path.name}")
+                self.sync_stats['skipped'] += 1
+                return
+            
+            # Both the new-format and the legacy path need the whole note;
+            # read the rest from the same handle instead of opening it again
+            if os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+                # Decode from the page cache without a bytes copy of the file
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    existing_content = _decode_text(mm)
+            else:
+                existing_content = _decode_text(head + f.read())
         
         # Check if file has new format markers
-        has_new_format = self.PAPERPILE_START in existing_content
+        has_new_format = PAPERPILE_START in existing_content
         
         if not has_new_format:
             logger.info(f"  Converting legacy format for {file_path.name}")
@@ -156,86 +457,22 @@ class PaperpileSync:
         # Rebuild content preserving user sections
         new_content = self.rebuild_content(entry, sections, new_paperpile_content)
         
-        file_path.write_text(new_content, encoding='utf-8')
+        _write_atomic(file_path, new_content)
         self.sync_stats['updated'] += 1
         print(f"  {Fore.GREEN}✓ Updated metadata{Style.RESET_ALL}")
         logger.info(f"  Updated metadata for {file_path.name}")
     
     def parse_content_sections(self, content: str) -> Dict[str, str]:
         """Parse content into sections based on markers"""
-        sections = {}
-        
-        # Extract Paperpile section
-        paperpile_match = re.search(
-            f"{re.escape(self.PAPERPILE_START)}(.*?){re.escape(self.PAPERPILE_END)}",
-            content, re.DOTALL
-        )
-        if paperpile_match:
-            sections['paperpile'] = paperpile_match.group(1).strip()
-        
-        # Extract user content section
-        user_match = re.search(
-            f"{re.escape(self.USER_START)}(.*?){re.escape(self.USER_END)}",
-            content, re.DOTALL
-        )
-        if user_match:
-            sections['user'] = user_match.group(1).strip()
-        
-        # Extract script generated section
-        script_match = re.search(
-            f"{re.escape(self.SCRIPT_START)}(.*?){re.escape(self.SCRIPT_END)}",
-            content, re.DOTALL
-        )
-        if script_match:
-            sections['script'] = script_match.group(1).strip()
-        
-        # Extract frontmatter
-        if content.startswith('---'):
-            fm_end = content.find('---', 3)
-            if fm_end > 0:
-                sections['frontmatter'] = content[3:fm_end].strip()
+        sections, unmarked = _scan_sections(content)
         
         # Any content outside marked sections is considered user content
-        unmarked = self.extract_unmarked_content(content)
         if unmarked:
             existing_user = sections.get('user', '')
             sections['user'] = f"{existing_user}\n\n{unmarked}".strip() if existing_user else unmarked
         
         return sections
     
-    def extract_unmarked_content(self, content: str) -> str:
-        """Extract content that's outside any marked sections"""
-        # Remove all marked sections
-        cleaned = content
-        
-        # Remove frontmatter
-        if cleaned.startswith('---'):
-            fm_end = cleaned.find('---', 3)
-            if fm_end > 0:
-                cleaned = cleaned[fm_end + 3:].lstrip()
-        
-        # Remove marked sections
-        for start, end in [
-            (self.PAPERPILE_START, self.PAPERPILE_END),
-            (self.USER_START, self.USER_END),
-            (self.SCRIPT_START, self.SCRIPT_END)
-        ]:
-            pattern = f"{re.escape(start)}.*?{re.escape(end)}"
-            cleaned = re.sub(pattern, '', cleaned, flags=re.DOTALL)
-        
-        # Remove title (first line starting with #)
-        lines = cleaned.strip().split('\n')
-        if lines and lines[0].startswith('#'):
-            lines = lines[1:]
-        
-        unmarked = '\n'.join(lines).strip()
-        
-        # Don't include if it's just whitespace or very short
-        if len(unmarked) < 10:
-            return ""
-        
-        return unmarked
-    
     def generate_article_content(self, entry: Dict) -> str:
         """Generate complete article content for new file"""
         # Generate components
@@ -246,21 +483,31 @@ class PaperpileSync:
         # Build complete content
         content = f"{frontmatter}\n\n"
         content += f"# {title}\n\n"
-        content += f"{self.PAPERPILE_START}\n{paperpile_section}\n{self.PAPERPILE_END}\n\n"
-        content += f"{self.SCRIPT_START}\n## Tags\n\n*Tags will be added by tagging script*\n{self.SCRIPT_END}\n\n"
-        content += f"{self.USER_START}\n## My Notes\n\n\n{self.USER_END}"
+        content += f"{PAPERPILE_START}\n{paperpile_section}\n{PAPERPILE_END}\n\n"
+        content += f"{SCRIPT_START}\n## Tags\n\n*Tags will be added by tagging script*\n{SCRIPT_END}\n\n"
+        content += f"{USER_START}\n## My Notes\n\n\n{USER_END}"
         
         return content
     
+    def entry_hash(self, entry: Dict) -> str:
+        """Short hash of everything the generated sections are built from"""
+        canonical = {field: entry[field] for field in HASH_FIELDS if field in entry}
+        # A PDF appearing or disappearing changes the metadata block as well
+        pdf_match = PDF_RE.search(entry.get('file', ''))
+        canonical['pdf'] = bool(pdf_match) and pdf_match.group(1) in self.pdf_index
+        data = json.dumps(canonical, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+    
     def generate_frontmatter(self, entry: Dict) -> str:
         """Generate YAML frontmatter with minimal aliases"""
         # Extract key metadata
-        authors = self.format_short_authors(entry.get('author', ''))
-        year = entry.get('year', '')
+        get = entry.get
+        authors = self.format_short_authors(get('author', ''))
+        year = get('year', '')
         
         # Generate minimal aliases - only short citation if year is valid
         aliases = []
-        if authors and year and re.match(r'^\d{4}$', str(year)):
+        if authors and year and YEAR_FULL_RE.match(str(year)):
             aliases.append(f"{authors} {year}")
         
         # Build frontmatter
@@ -269,98 +516,63 @@ class PaperpileSync:
             yaml += "aliases:\n"
             for alias in aliases:
                 yaml += f'  - "{alias}"\n'
+        yaml += f"paperpile_hash: {self.entry_hash(entry)}\n"
         yaml += "---"
         
         return yaml
     
     def generate_paperpile_section(self, entry: Dict) -> str:
         """Generate Paperpile metadata section"""
-        sections = []
-        
-        # Metadata section
-        metadata = ["## Metadata"]
-        metadata.append(f"**Type:** {entry.get('ENTRYTYPE', 'article').title()}")
-        
-        # Authors with wiki links
-        if entry.get('author'):
-            authors = self.format_authors_with_links(entry['author'])
-            metadata.append(f"**Author(s):** {authors}")
-        
-        metadata.append(f"**Year:** {entry.get('year', 'n.d.')}")
-        
+        get = entry.get
+        entry_type = get('ENTRYTYPE', 'article')
+        author = get('author')
         # Journal with wiki link (handle both 'journal' and 'journaltitle')
-        journal = entry.get('journal') or entry.get('journaltitle')
-        if journal:
-            metadata.append(f"**Journal:** [[{journal}]]")
-        
-        # Publisher
-        if entry.get('publisher'):
-            metadata.append(f"**Publisher:** {entry['publisher']}")
-        
-        # DOI with clickable link
-        if entry.get('doi'):
-            doi = entry['doi']
-            metadata.append(f"**DOI:** [{doi}](https://doi.org/{doi})")
-        
-        sections.append('\n'.join(metadata))
-        
-        # Abstract section
-        if entry.get('abstract'):
-            abstract = self.clean_field(entry['abstract'])
-            sections.append(f"## Abstract\n\n{abstract}")
-        
-        # Additional Information section
-        additional = ["## Additional Information"]
-        
-        if entry.get('volume'):
-            additional.append(f"**Volume:** {entry['volume']}")
-        
-        if entry.get('number') or entry.get('issue'):
-            issue = entry.get('number') or entry.get('issue')
-            additional.append(f"**Issue:** {issue}")
-        
-        if entry.get('pages'):
-            additional.append(f"**Pages:** {entry['pages']}")
-        
-        if entry.get('url'):
-            url = entry['url']
-            additional.append(f"**URL:** [View Online]({url})")
-        
-        # PDF link
-        pdf_path = self.extract_pdf_path(entry.get('file', ''))
-        if pdf_path:
-            additional.append(f"**PDF:** [[{pdf_path}]]")
-        
-        if entry.get('language'):
-            additional.append(f"**Language:** {entry['language']}")
-        
-        if len(additional) > 1:  # More than just the header
-            sections.append('\n'.join(additional))
-        
-        # Paperpile Notes section (user's notes from Paperpile)
-        if entry.get('note'):
-            note = self.clean_field(entry['note'])
-            sections.append(f"## Paperpile Notes\n\n{note}")
-        
-        # Reference Information section
-        ref_info = ["## Reference Information"]
-        ref_info.append(f"**BibTeX Key:** {entry['ID']}")
-        ref_info.append(f"**Entry Type:** @{entry.get('ENTRYTYPE', 'article')}")
-        
-        if entry.get('keywords'):
-            keywords = entry['keywords']
-            ref_info.append(f"**Keywords:** {keywords}")
-        
-        ref_info.append(f"**Last Paperpile Sync:** {datetime.now():%Y-%m-%d %H:%M:%S}")
-        sections.append('\n'.join(ref_info))
-        
-        return '\n\n'.join(sections)
+        journal = get('journal') or get('journaltitle')
+        publisher = get('publisher')
+        doi = get('doi')
+        abstract = get('abstract')
+        volume = get('volume')
+        issue = get('number') or get('issue')
+        pages = get('pages')
+        url = get('url')
+        pdf_path = self.extract_pdf_path(get('file', ''))
+        language = get('language')
+        note = get('note')
+        keywords = get('keywords')
+        
+        # Additional Information is only emitted when it has any lines
+        additional = ''.join((
+            f"\n**Volume:** {volume}" if volume else '',
+            f"\n**Issue:** {issue}" if issue else '',
+            f"\n**Pages:** {pages}" if pages else '',
+            f"\n**URL:** [View Online]({url})" if url else '',
+            f"\n**PDF:** [[{pdf_path}]]" if pdf_path else '',
+            f"\n**Language:** {language}" if language else '',
+        ))
+        
+        return ''.join((
+            # Metadata section, authors and journal as wiki links
+            f"## Metadata\n**Type:** {entry_type.title()}",
+            f"\n**Author(s):** {self.format_authors_with_links(author)}" if author else '',
+            f"\n**Year:** {get('year', 'n.d.')}",
+            f"\n**Journal:** [[{journal}]]" if journal else '',
+            f"\n**Publisher:** {publisher}" if publisher else '',
+            f"\n**DOI:** [{doi}](https://doi.org/{doi})" if doi else '',
+            f"\n\n## Abstract\n\n{self.clean_field(abstract)}" if abstract else '',
+            f"\n\n## Additional Information{additional}" if additional else '',
+            # Paperpile Notes section (user's notes from Paperpile)
+            f"\n\n## Paperpile Notes\n\n{self.clean_field(note)}" if note else '',
+            f"\n\n## Reference Information\n**BibTeX Key:** {entry['ID']}\n**Entry Type:** @{entry_type}",
+            f"\n**Keywords:** {keywords}" if keywords else '',
+            f"\n**Last Paperpile Sync:** {datetime.now():%Y-%m-%d %H:%M:%S}",
+        ))
     
     def format_title(self, entry: Dict) -> str:
         """Format article title for display"""
-        title = self.clean_field(entry.get('title', 'Untitled'))
-        authors = self.format_short_authors(entry.get('author', ''))
-        year = entry.get('year', 'n.d.')
+        get = entry.get
+        title = self.clean_field(get('title', 'Untitled'))
+        authors = self.format_short_authors(get('author', ''))
+        year = get('year', 'n.d.')
         
         if authors:
             return f"{authors} ({year}). {title}"
@@ -369,25 +581,7 @@ class PaperpileSync:
     
     def format_authors_with_links(self, author_string: str) -> str:
         """Format authors with wiki links"""
-        authors = author_string.split(' and ')
-        formatted = []
-        
-        for author in authors:
-            author = author.strip()
-            # Format as [[Last, First]]
-            if ',' in author:
-                formatted.append(f"[[{author}]]")
-            else:
-                # Convert "First Last" to "Last, First"
-                parts = author.split()
-                if len(parts) >= 2:
-                    last = parts[-1]
-                    first = ' '.join(parts[:-1])
-                    formatted.append(f"[[{last}, {first}]]")
-                else:
-                    formatted.append(f"[[{author}]]")
-        
-        return ', '.join(formatted)
+        return ', '.join(_link_author(author) for author in author_string.split(' and '))
     
     def extract_pdf_path(self, file_field: str) -> str:
         """Extract PDF path from BibTeX file field"""
@@ -395,16 +589,14 @@ class PaperpileSync:
             return ""
         
         # Look for "All Papers/..." pattern
-        match = re.search(r'(All Papers/[^:;]+\.pdf)', file_field)
+        match = PDF_RE.search(file_field)
         if match:
             paperpile_path = match.group(1)
             # Create Obsidian path (using lowercase as per user example)
             obsidian_path = f"9 paperpile/{paperpile_path}"
             
-            # Verify the PDF actually exists
-            full_path = self.vault_path / "9 Paperpile" / "Paperpile" / paperpile_path
-            
-            if full_path.exists():
+            # Verify the PDF actually exists (the index misses case-insensitive matches)
+            if paperpile_path in self.pdf_index or (self.pdf_root / paperpile_path).exists():
                 return obsidian_path
             else:
                 print(f"  {Fore.YELLOW}⚠ PDF not found: {paperpile_path}{Style.RESET_ALL}")
@@ -440,25 +632,12 @@ class PaperpileSync:
                 continue
             
             # Skip metadata sections that will be regenerated
-            if line.startswith('## Metadata') or \
-               line.startswith('## Abstract') or \
-               line.startswith('## Additional Information') or \
-               line.startswith('## Zotero Information') or \
-               line.startswith('## Collections'):
+            if LEGACY_SECTION_RE.match(line):
                 skip_next = True
                 continue
             
             # Skip known metadata lines
-            if line.startswith('**Type:**') or \
-               line.startswith('**Author(s):**') or \
-               line.startswith('**Date:**') or \
-               line.startswith('**Publisher:**') or \
-               line.startswith('**Pages:**') or \
-               line.startswith('**ISBN:**') or \
-               line.startswith('**Key:**') or \
-               line.startswith('**Item ID:**') or \
-               line.startswith('**Date Added:**') or \
-               line.startswith('**Date Modified:**'):
+            if LEGACY_FIELD_RE.match(line):
                 continue
             
             # Check if we should skip this line
@@ -477,12 +656,12 @@ class PaperpileSync:
         # Build new content with proper sections
         new_content = self.generate_frontmatter(entry) + "\n\n"
         new_content += f"# {self.format_title(entry)}\n\n"
-        new_content += f"{self.PAPERPILE_START}\n{self.generate_paperpile_section(entry)}\n{self.PAPERPILE_END}\n\n"
+        new_content += f"{PAPERPILE_START}\n{self.generate_paperpile_section(entry)}\n{PAPERPILE_END}\n\n"
         
         # Add script section for tags
         # Extract existing tags from legacy content
         existing_tags = []
-        tag_match = re.findall(r'#(\S+)', existing_content)
+        tag_match = TAG_RE.findall(existing_content)
         if tag_match:
             existing_tags = list(set(tag_match))
         
@@ -493,7 +672,7 @@ class PaperpileSync:
         else:
             tags_content = "## Tags\n\n*Tags will be added by tagging script*"
         
-        new_content += f"{self.SCRIPT_START}\n{tags_content}\n{self.SCRIPT_END}\n\n"
+        new_content += f"{SCRIPT_START}\n{tags_content}\n{SCRIPT_END}\n\n"
         
         # Add user content section
         if user_content:
@@ -501,10 +680,10 @@ class PaperpileSync:
         else:
             user_section = "## My Notes\n\n"
         
-        new_content += f"{self.USER_START}\n{user_section}\n{self.USER_END}"
+        new_content += f"{USER_START}\n{user_section}\n{USER_END}"
         
         # Write the converted file
-        file_path.write_text(new_content, encoding='utf-8')
+        _write_atomic(file_path, new_content)
         self.sync_stats['updated'] += 1
         print(f"  {Fore.GREEN}✓ Converted legacy format{Style.RESET_ALL}")
         logger.info(f"  Successfully converted {file_path.name} to new format")
@@ -518,19 +697,19 @@ class PaperpileSync:
         content += f"# {self.format_title(entry)}\n\n"
         
         # Add Paperpile section
-        content += f"{self.PAPERPILE_START}\n{new_paperpile}\n{self.PAPERPILE_END}\n\n"
+        content += f"{PAPERPILE_START}\n{new_paperpile}\n{PAPERPILE_END}\n\n"
         
         # Add script generated section if exists
         if sections.get('script'):
-            content += f"{self.SCRIPT_START}\n{sections['script']}\n{self.SCRIPT_END}\n\n"
+            content += f"{SCRIPT_START}\n{sections['script']}\n{SCRIPT_END}\n\n"
         else:
-            content += f"{self.SCRIPT_START}\n## Tags\n\n*Tags will be added by tagging script*\n{self.SCRIPT_END}\n\n"
+            content += f"{SCRIPT_START}\n## Tags\n\n*Tags will be added by tagging script*\n{SCRIPT_END}\n\n"
         
         # Add user content if exists
         if sections.get('user'):
-            content += f"{self.USER_START}\n{sections['user']}\n{self.USER_END}"
+            content += f"{USER_START}\n{sections['user']}\n{USER_END}"
         else:
-            content += f"{self.USER_START}\n## My Notes\n\n\n{self.USER_END}"
+            content += f"{USER_START}\n## My Notes\n\n\n{USER_END}"
         
         return content
     
@@ -540,13 +719,13 @@ class PaperpileSync:
             return ""
         
         # Remove BibTeX braces
-        text = re.sub(r'[{}]', '', text)
+        text = text.translate(BRACE_TRANS)
         
         # Fix LaTeX quotes
         text = text.replace("``", '"').replace("''", '"')
         
         # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = WS_RE.sub(' ', text)
         
         return text.strip()
     
@@ -572,11 +751,11 @@ class PaperpileSync:
     def extract_lastname(self, author: str) -> str:
         """Extract last name from author string"""
         author = author.strip()
-        if ',' in author:
-            return author.split(',')[0].strip()
-        else:
-            parts = author.split()
-            return parts[-1] if parts else ""
+        head, sep, _ = author.partition(',')
+        if sep:
+            return head.strip()
+        # rsplit splits on any whitespace like split() but builds at most two parts
+        return author.rsplit(None, 1)[-1] if author else ""
     
     def extract_title_keywords(self, title: str) -> str:
         """Extract keywords from title for aliases - NO LONGER USED"""
@@ -584,27 +763,32 @@ class PaperpileSync:
     
     def find_orphaned_files(self):
         """Find markdown files not in current BibTeX"""
-        bibtex_keys = set(self.bibtex_entries.keys())
+        bibtex_keys = self.bibtex_entries.keys()
+        
+        # Filenames are BibTeX keys after migration, so only files whose
+        # name is not a key are candidates
+        md_files = {md_file.stem: md_file for md_file in self.articles_dir.glob("*.md")}
         
-        for md_file in self.articles_dir.glob("*.md"):
-            # Extract BibTeX key from filename or content
-            file_key = md_file.stem  # Assuming migration completed
+        for file_key in sorted(md_files.keys() - bibtex_keys):
+            md_file = md_files[file_key]
             
-            if file_key not in bibtex_keys:
+            if self.strict_orphan:
                 # Double check by looking in file content
                 content = md_file.read_text(encoding='utf-8')
-                key_match = re.search(r'bibtex_key:\s*(\S+)', content) or \
-                           re.search(r'BibTeX Key:\s*(\S+)', content)
+                key_match = FRONTMATTER_KEY_RE.search(content) or \
+                           BODY_KEY_RE.search(content)
                 
                 if key_match:
                     file_key = key_match.group(1)
                 
-                if file_key not in bibtex_keys:
-                    self.sync_stats['orphaned'].append({
-                        'file': md_file.name,
-                        'key': file_key,
-                        'path': str(md_file)
-                    })
+                if file_key in bibtex_keys:
+                    continue
+            
+            self.sync_stats['orphaned'].append({
+                'file': md_file.name,
+                'key': file_key,
+                'path': str(md_file)
+            })
         
         if self.sync_stats['orphaned']:
             print(f"  {Fore.YELLOW}⚠ Found {len(self.sync_stats['orphaned'])} orphaned files{Style.RESET_ALL}")
@@ -638,8 +822,11 @@ class PaperpileSync:
         report_path = self.vault_path / Path(__file__).parent.parent / "export" / f"sync_report_{datetime.now():%Y%m%d_%H%M%S}.json"
         report_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            report_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        else:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
         
         print(f"\n📄 Detailed report saved to: {report_path}")
 
@@ -672,6 +859,11 @@ def main():
         default=True,
         help='Run synchronization (default action)'
     )
+    parser.add_argument(
+        '--strict-orphan',
+        action='store_true',
+        help='Check the content of unmatched files for a BibTeX key before reporting them as orphaned'
+    )
     
     args = parser.parse_args()
     
@@ -689,7 +881,7 @@ def main():
         return
     
     # Run sync
-    syncer = PaperpileSync(vault_path, bibtex_path)
+    syncer = PaperpileSync(vault_path, bibtex_path, strict_orphan=args.strict_orphan)
     try:
         syncer.run_sync(test_limit=args.test)
     except KeyboardInterrupt:
@@ -10,20 +10,71 @@ import re
 import json
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import shutil
 from datetime import datetime
 
+# Vaults with fewer Markdown files than this are rewritten in-process
+_PARALLEL_THRESHOLD = 64
+
+# Per-worker applier and compiled batch, set once by the pool initializer
+_worker_state = None
+
+
+def _walk_md(root):
+    """Yield paths of non-empty Markdown files below root, files before subdirectories"""
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        elif entry.name.endswith('.md') and entry.is_file() and entry.stat().st_size:
+            yield entry.path
+    for subdir in subdirs:
+        yield from _walk_md(subdir)
+
+
+def _decode_text(data: bytes) -> str:
+    """Decode a UTF-8 buffer with universal newlines, as text-mode open would"""
+    text = str(data, 'utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _init_worker(applier: 'TagCleanupApplier', batch):
+    global _worker_state
+    _worker_state = (applier, batch)
+
+
+def _rewrite_chunk(paths):
+    """Rewrite a slice of files in a worker; return its counts and each file's error"""
+    applier, batch = _worker_state
+    applier.changes_applied = 0
+    errors = [applier._rewrite_file(md_file, batch) for md_file in paths]
+    modified = [md_file for md_file in paths if md_file in applier.files_modified]
+    return applier.changes_applied, modified, errors
+
+
 class TagCleanupApplier:
     def __init__(self, vault_path: str):
         self.vault_path = Path(vault_path)
         self.changes_applied = 0
         self.files_modified = set()
+        self.tag_files = None
         
         # Create backup directory
         self.backup_dir = self.vault_path / f"tag_cleanup_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-    def apply_recommendations(self, recommendations_file: str = None):
+    def apply_recommendations(self, recommendations_file: str = None, tag_files: dict = None):
         """Apply tag cleanup recommendations"""
+        # Inverted index (tag -> files) from the analysis report; when given,
+        # only files listed under an affected tag are opened
+        self.tag_files = tag_files
         
         # Load recommendations
         if recommendations_file and Path(recommendations_file).exists():
@@ -148,34 +199,125 @@ class TagCleanupApplier:
                 
             response = input("\nApply these changes? [y/n]: ")
             if response.lower() == 'y':
-                for change in changes:
-                    self._apply_single_change(change)
+                self._apply_changes(changes)
                     
     def _apply_all(self, recommendations):
         """Apply all recommendations"""
         print("\nApplying all changes...")
-        
-        for i, change in enumerate(recommendations):
-            self._apply_single_change(change)
-            
-            # Progress indicator
-            if (i + 1) % 10 == 0:
-                print(f"  Processed {i + 1}/{len(recommendations)} changes...")
+        self._apply_changes(recommendations)
                 
-    def _apply_single_change(self, change):
-        """Apply a single tag change across all files"""
+    def _compile_change(self, change):
+        """Compile the literal and regex forms used to rewrite one tag"""
         from_tag = change['from']
         to_tag = change['to']
+        from_tag_clean = from_tag.replace('#', '')
+        to_tag_clean = to_tag.replace('#', '')
+        
+        # (literal prefilter, pattern, replacement) for hashtag and YAML forms
+        substitutions = (
+            (f'#{from_tag_clean}', re.compile(f'#({re.escape(from_tag_clean)})\\b'), f'#{to_tag_clean}'),
+            (f'"{from_tag}"', re.compile(f'"{re.escape(from_tag)}"'), f'"{to_tag}"'),
+            (f"'{from_tag}'", re.compile(f"'{re.escape(from_tag)}'"), f"'{to_tag}'"),
+        )
+        return from_tag, from_tag_clean, to_tag_clean, substitutions
         
-        # Find all files containing the tag
-        for md_file in self.vault_path.rglob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    original_content = content
+    def _combine_hashtags(self, compiled):
+        """Build one alternation for all hashtag rewrites, or None if changes interact"""
+        mapping = {}
+        for from_tag, from_clean, to_clean, _ in compiled:
+            if (not from_clean or from_clean in mapping or '\\' in to_clean
+                    or from_tag not in (from_clean, f'#{from_clean}')):
+                return None, None
+            mapping[from_clean] = to_clean
+            
+        # A single scan only matches the change-by-change order when no tag
+        # is a prefix of another change's source or target (chains, overlaps)
+        for key in mapping:
+            for other, value in mapping.items():
+                if key == other:
+                    continue
+                if other.startswith(key) or value.startswith(key) or key.startswith(value):
+                    return None, None
                     
+        keys = sorted(mapping, key=len, reverse=True)
+        pattern = re.compile('#(' + '|'.join(map(re.escape, keys)) + ')\\b')
+        return pattern, mapping
+        
+    def _apply_changes(self, changes):
+        """Apply a batch of tag changes in a single pass over all files"""
+        compiled = [self._compile_change(change) for change in changes]
+        # Source tags as UTF-8, to skip files without decoding them
+        needles = tuple(from_tag.encode('utf-8') for from_tag, _, _, _ in compiled)
+        batch = (compiled, *self._combine_hashtags(compiled), needles)
+        
+        if self.tag_files is None:
+            paths = list(_walk_md(self.vault_path))
+        else:
+            paths = self._indexed_files(compiled)
+        if len(paths) < _PARALLEL_THRESHOLD:
+            errors = (self._rewrite_file(md_file, batch) for md_file in paths)
+        else:
+            errors = self._rewrite_in_pool(paths, batch)
+            
+        for i, error in enumerate(errors):
+            if error is not None:
+                print(error)
+                
+            # Progress indicator
+            if (i + 1) % 500 == 0:
+                print(f"  Processed {i + 1} files...")
+                
+    def _indexed_files(self, compiled):
+        """Files the inverted index lists under any tag a change can rewrite"""
+        # A hashtag rewrite also hits longer tags that start with the source
+        # (#ai in #ai-learning), so match on the cleaned prefix
+        prefixes = tuple(from_clean for _, from_clean, _, _ in compiled)
+        paths = {}
+        for tag, files in self.tag_files.items():
+            if tag.replace('#', '').startswith(prefixes):
+                paths.update(dict.fromkeys(files))
+        return list(paths)
+        
+    def _rewrite_in_pool(self, paths, batch):
+        """Rewrite files in worker processes, yielding each one's error in order"""
+        # Files are independent, so workers rewrite them in parallel and hand
+        # back their counts; backups are written by the worker that edits a file
+        workers = os.cpu_count() or 1
+        size = max(1, len(paths) // (4 * workers))
+        chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self, batch)) as executor:
+            for changes_applied, modified, errors in executor.map(_rewrite_chunk, chunks):
+                self.changes_applied += changes_applied
+                self.files_modified.update(modified)
+                yield from errors
+                
+    def _rewrite_file(self, md_file, batch):
+        """Apply a compiled batch to one file; return an error message or None"""
+        compiled, hashtag_re, hashtag_map, needles = batch
+        try:
+            with open(md_file, 'rb') as f:
+                data = f.read()
+                
+            # No change can apply unless a source tag occurs somewhere
+            if not any(needle in data for needle in needles):
+                return None
+            content = _decode_text(data)
+            original_content = content
+                
+            # Independent changes rewrite every hashtag in one scan
+            matched = set()
+            if hashtag_re is not None and '#' in content:
+                def replace(match):
+                    matched.add(match.group(1))
+                    return '#' + hashtag_map[match.group(1)]
+                content = hashtag_re.sub(replace, content)
+                
+            # Apply changes in order so chained merges behave as before
+            for from_tag, from_clean, to_clean, substitutions in compiled:
                 # Check if file contains the tag
-                if from_tag not in content:
+                if from_tag not in (content if hashtag_re is None else original_content):
                     continue
                     
                 # Backup file if first modification
@@ -183,44 +325,28 @@ class TagCleanupApplier:
                     self._backup_file(md_file)
                     self.files_modified.add(md_file)
                     
-                # Replace hashtag-style tags
-                from_tag_clean = from_tag.replace('#', '')
-                to_tag_clean = to_tag.replace('#', '')
-                
-                # Replace in content (hashtag style)
-                content = re.sub(
-                    f'#({re.escape(from_tag_clean)})\\b',
-                    f'#{to_tag_clean}',
-                    content
-                )
-                
-                # Replace in YAML frontmatter
-                content = re.sub(
-                    f'"{re.escape(from_tag)}"',
-                    f'"{to_tag}"',
-                    content
-                )
-                content = re.sub(
-                    f"'{re.escape(from_tag)}'",
-                    f"'{to_tag}'",
-                    content
-                )
-                
-                # Write back if changed
-                if content != original_content:
-                    with open(md_file, 'w', encoding='utf-8') as f:
-                        f.write(content)
+                before = content
+                if hashtag_re is not None:
+                    # Hashtags were already rewritten above
+                    substitutions = substitutions[1:]
+                for literal, pattern, replacement in substitutions:
+                    if literal in content:
+                        content = pattern.sub(replacement, content)
+                if content != before or (from_clean in matched and to_clean != from_clean):
                     self.changes_applied += 1
                     
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
-                
+            # Write back once if anything changed
+            if content != original_content:
+                with open(md_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                    
+        except Exception as e:
+            return f"Error processing {md_file}: {e}"
+        return None
+        
     def _backup_file(self, file_path):
         """Create backup of file before modification"""
-        if not self.backup_dir.exists():
-            self.backup_dir.mkdir(parents=True)
-            
-        relative_path = file_path.relative_to(self.vault_path)
+        relative_path = os.path.relpath(file_path, self.vault_path)
         backup_path = self.backup_dir / relative_path
         backup_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -243,10 +369,21 @@ def main():
     parser.add_argument('--path', default='/Users/niklaskarlsson/Obsidian/Book project',
                         help='Path to Obsidian vault')
     parser.add_argument('--recommendations', help='Path to recommendations JSON file')
+    parser.add_argument('--use-report-index', action='store_true',
+                        help='Only open files the analysis report lists under an affected tag')
     args = parser.parse_args()
     
+    tag_files = None
+    if args.use_report_index:
+        report_path = Path(args.path) / 'tag_analysis_report.json'
+        if report_path.exists():
+            with open(report_path, 'r', encoding='utf-8') as f:
+                tag_files = json.load(f).get('tag_files')
+        if tag_files is None:
+            print("No tag index in the analysis report, scanning all files. Re-run tag_cleanup_simple.py first.")
+    
     applier = TagCleanupApplier(args.path)
-    applier.apply_recommendations(args.recommendations)
+    applier.apply_recommendations(args.recommendations, tag_files)
     applier.finish()
 
 
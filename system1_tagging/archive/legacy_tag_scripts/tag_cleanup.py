@@ -8,17 +8,91 @@ It identifies duplicate tags, similar tags, and provides interactive cleanup opt
 
 import os
 import re
+import mmap
 import json
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 from difflib import SequenceMatcher
+from functools import lru_cache
+from bisect import bisect_right
+from itertools import islice
 from pathlib import Path
 import argparse
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Optional
 import colorama
 from colorama import Fore, Style, Back
 
+try:
+    import numpy as np
+    from rapidfuzz import fuzz as rapidfuzz_fuzz, process as rapidfuzz_process
+except ImportError:
+    np = rapidfuzz_fuzz = rapidfuzz_process = None
+
 colorama.init()
 
+
+# Byte-level patterns so files can be scanned through mmap without decoding;
+# å, ä, ö, Å, Ä and Ö are matched as their two-byte UTF-8 sequences
+HASHTAG_RE = re.compile(rb'#((?:[a-zA-Z0-9_\-/]|\xc3[\xa5\xa4\xb6\x85\x84\x96])+)')
+FRONTMATTER_RE = re.compile(rb'^---\r?\n(.*?)\r?\n---', re.DOTALL)
+TAGS_LINE_RE = re.compile(rb'^tags:\s*\[(.*?)\]', re.MULTILINE)
+
+# Drops every '#' and turns dashes and spaces into underscores in one pass
+TAG_TRANS = str.maketrans({'#': None, '-': '_', ' ': '_'})
+
+# Vaults with fewer Markdown files than this are scanned in-process
+_PARALLEL_THRESHOLD = 64
+
+
+def _walk_md(root):
+    """Yield paths of non-empty Markdown files below root, files before subdirectories"""
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        elif entry.name.endswith('.md') and entry.is_file() and entry.stat().st_size:
+            yield entry.path
+    for subdir in subdirs:
+        yield from _walk_md(subdir)
+
+
+def _scan_path(file_path: str) -> Tuple[List[Tuple[str, int]], Optional[str]]:
+    """Collect (tag, line number) pairs from one file; frontmatter tags get line 0"""
+    found = []
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return found, None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                # Find hashtag-style tags, counting lines incrementally
+                line_num = 1
+                last_pos = 0
+                for match in HASHTAG_RE.finditer(content):
+                    line_num += content[last_pos:match.start()].count(b'\n')
+                    last_pos = match.start()
+                    found.append((f"#{match.group(1).decode('utf-8')}", line_num))
+                    
+                # Find YAML frontmatter tags
+                yaml_match = FRONTMATTER_RE.match(content)
+                if yaml_match:
+                    tag_line_match = TAGS_LINE_RE.search(yaml_match.group(1))
+                    if tag_line_match:
+                        tags_str = tag_line_match.group(1).decode('utf-8')
+                        for tag in tags_str.split(','):
+                            clean_tag = tag.strip().strip('"').strip("'")
+                            if clean_tag:
+                                found.append((clean_tag, 0))
+                                
+    except Exception as e:
+        return found, str(e)
+    return found, None
+
+
 class TagAnalyzer:
     def __init__(self, vault_path: str):
         self.vault_path = Path(vault_path)
@@ -30,79 +104,103 @@ class TagAnalyzer:
         """Scan all markdown files for tags"""
         print(f"{Fore.CYAN}Scanning vault for tags...{Style.RESET_ALL}")
         
-        for md_file in self.vault_path.rglob("*.md"):
-            self._scan_file(md_file)
+        paths = list(_walk_md(self.vault_path))
+        if len(paths) < _PARALLEL_THRESHOLD:
+            for md_file in paths:
+                self._scan_file(md_file)
+        else:
+            # Files are scanned in worker processes and merged here in walk
+            # order, so tag and file ordering match a serial scan
+            workers = os.cpu_count() or 1
+            size = max(1, len(paths) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for md_file, result in zip(paths, executor.map(_scan_path, paths, chunksize=size)):
+                    self._record_tags(md_file, *result)
             
         print(f"{Fore.GREEN}Found {len(self.tags)} unique tags across {len(self.file_tags)} files{Style.RESET_ALL}")
         
-    def _scan_file(self, file_path: Path):
+    def _scan_file(self, file_path: str):
         """Scan a single file for tags"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Find hashtag-style tags
-            hashtag_pattern = r'#([a-zA-Z0-9_\-åäöÅÄÖ/]+)'
-            for match in re.finditer(hashtag_pattern, content):
-                tag = match.group(1)
-                line_num = content[:match.start()].count('\n') + 1
-                self.tags[f"#{tag}"].append((str(file_path), line_num))
-                self.file_tags[str(file_path)].add(f"#{tag}")
-                
-                # Store normalized version
-                normalized = self._normalize_tag(tag)
-                self.tag_variations[normalized].add(f"#{tag}")
-                
-            # Find YAML frontmatter tags
-            yaml_match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-            if yaml_match:
-                yaml_content = yaml_match.group(1)
-                tag_line_match = re.search(r'^tags:\s*\[(.*?)\]', yaml_content, re.MULTILINE)
-                if tag_line_match:
-                    tags_str = tag_line_match.group(1)
-                    tags = [t.strip() for t in tags_str.split(',')]
-                    for tag in tags:
-                        clean_tag = tag.strip('"').strip("'")
-                        if clean_tag:
-                            self.tags[clean_tag].append((str(file_path), 0))
-                            self.file_tags[str(file_path)].add(clean_tag)
-                            
-                            normalized = self._normalize_tag(clean_tag)
-                            self.tag_variations[normalized].add(clean_tag)
-                            
-        except Exception as e:
-            print(f"{Fore.RED}Error reading {file_path}: {e}{Style.RESET_ALL}")
+        self._record_tags(file_path, *_scan_path(file_path))
+        
+    def _record_tags(self, file_path: str, found: List[Tuple[str, int]], error: Optional[str]):
+        """Merge the tags found in one file into the vault-wide indexes"""
+        for tag, line_num in found:
+            self.tags[tag].append((str(file_path), line_num))
+            self.file_tags[str(file_path)].add(tag)
+            
+            # Store normalized version
+            normalized = self._normalize_tag(tag)
+            self.tag_variations[normalized].add(tag)
+            
+        if error is not None:
+            print(f"{Fore.RED}Error reading {file_path}: {error}{Style.RESET_ALL}")
             
-    def _normalize_tag(self, tag: str) -> str:
-        """Normalize tag for comparison"""
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _normalize_tag(tag: str) -> str:
+        """Normalize tag for comparison
+        
+        Cached: it runs once per tag occurrence while scanning.
+        """
         # Remove # if present, lowercase, replace spaces/dashes with underscore
-        normalized = tag.lower()
-        normalized = normalized.replace('#', '')
-        normalized = normalized.replace('-', '_')
-        normalized = normalized.replace(' ', '_')
-        return normalized
+        return tag.lower().translate(TAG_TRANS)
         
     def find_similar_tags(self, threshold: float = 0.8) -> List[Tuple[str, str, float]]:
         """Find similar tags based on string similarity"""
         similar_pairs = []
         tag_list = list(self.tags.keys())
+        lowered = [tag.lower() for tag in tag_list]
+        normalized = [self._normalize_tag(tag) for tag in tag_list]
         
-        for i in range(len(tag_list)):
-            for j in range(i + 1, len(tag_list)):
-                tag1, tag2 = tag_list[i], tag_list[j]
+        for i, j in self._similarity_candidates(lowered, threshold):
+            # Skip if they're already variations of the same tag
+            if normalized[i] == normalized[j]:
+                continue
+                
+            matcher = SequenceMatcher(None, lowered[i], lowered[j])
+            if matcher.quick_ratio() < threshold:
+                continue
+            similarity = matcher.ratio()
+            if similarity >= threshold:
+                similar_pairs.append((tag_list[i], tag_list[j], similarity))
                 
-                # Skip if they're already variations of the same tag
-                norm1 = self._normalize_tag(tag1)
-                norm2 = self._normalize_tag(tag2)
-                if norm1 == norm2:
-                    continue
-                    
-                similarity = SequenceMatcher(None, tag1.lower(), tag2.lower()).ratio()
-                if similarity >= threshold:
-                    similar_pairs.append((tag1, tag2, similarity))
-                    
         return sorted(similar_pairs, key=lambda x: x[2], reverse=True)
         
+    def _similarity_candidates(self, lowered: List[str], threshold: float):
+        """Yield index pairs (i < j, in order) that might reach the threshold"""
+        # With threshold <= 0 every pair qualifies, which the buckets below
+        # already yield without scoring the full matrix
+        if rapidfuzz_process is not None and lowered and threshold > 0:
+            # fuzz.ratio scores the longest common subsequence, an upper bound
+            # on SequenceMatcher's matching blocks, so it can only over-select
+            scores = rapidfuzz_process.cdist(
+                lowered, lowered, scorer=rapidfuzz_fuzz.ratio,
+                score_cutoff=threshold * 100 - 1e-6, workers=-1
+            )
+            # Scores below the cutoff are 0; nonzero() walks the upper
+            # triangle in row-major order, so pairs keep their (i, j) order
+            rows, cols = np.nonzero(np.triu(scores, 1))
+            yield from zip(rows.tolist(), cols.tolist())
+            return
+            
+        # Bucket tags by length; ratio() is at most 2 * min(la, lb) / (la + lb),
+        # so only buckets whose lengths can reach the threshold are compared
+        by_length = defaultdict(list)
+        for i, tag in enumerate(lowered):
+            by_length[len(tag)].append(i)
+        reachable = {
+            la: [lb for lb in by_length if la + lb == 0 or 2.0 * min(la, lb) / (la + lb) >= threshold]
+            for la in by_length
+        }
+        for i, tag in enumerate(lowered):
+            # Visit candidates in the original pair order so ties sort as before
+            yield from ((i, j) for j in sorted(
+                j
+                for lb in reachable[len(tag)]
+                for j in islice(by_length[lb], bisect_right(by_length[lb], i), None)
+            ))
+        
     def find_tag_variations(self) -> Dict[str, Set[str]]:
         """Find tags that are variations of each other"""
         variations = {}
@@ -125,6 +223,7 @@ class TagAnalyzer:
             'total_tags': len(self.tags),
             'total_files': len(self.file_tags),
             'tag_usage': {tag: len(locs) for tag, locs in self.tags.items()},
+            'tag_files': {tag: list(dict.fromkeys(path for path, _ in locs)) for tag, locs in self.tags.items()},
             'variations': self.find_tag_variations(),
             'similar_tags': self.find_similar_tags(),
             'unused_tags': self.find_unused_tags(),